@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,9 +9,48 @@ class Settings(BaseSettings):
     supabase_anon_key: str = ""
     supabase_service_role_key: str = ""
     supabase_key: str = ""
+    supabase_jwt_secret: str = ""
+    supabase_jwt_audience: str = "authenticated"
     groq_api_key: str = ""
     default_provider: str = "groq"
     cors_allowed_origins: str = "http://localhost:3000,http://127.0.0.1:3000,http://localhost:5173,http://127.0.0.1:5173,http://localhost:8080,http://127.0.0.1:8080"
+    supabase_pool_size: int = 20
+    supabase_max_connections: int = 100
+    supabase_idle_timeout_seconds: float = 30.0
+    health_stats_token: str = ""
+    ingredient_catalog_ttl_seconds: int = 300
+    ingredient_catalog_max_age_seconds: int = 1800
+    profile_cache_ttl_seconds: int = 3600
+    profile_cache_max_entries: int = 10000
+    groq_client_pool_size: int = 64
+    groq_client_idle_seconds: int = 600
+    groq_max_connections: int = 100
+    groq_max_keepalive_connections: int = 20
+    audio_upload_max_bytes: int = 25 * 1024 * 1024
+    audio_upload_memory_bytes: int = 1024 * 1024
+    transcription_cache_ttl_seconds: int = 3600
+    transcription_cache_max_entries: int = 1000
+    response_cache_enabled: bool = True
+    response_cache_backend: Literal["memory", "sqlite"] = "memory"
+    response_cache_path: str = "response_cache.sqlite3"
+    response_cache_max_entries: int = 1000
+    response_cache_ttl_seconds: int = 1800
+    recipe_store_max_entries: int = 2000
+    recipe_store_ttl_seconds: int = 24 * 3600
+    recipe_store_min_coverage: int = 80
+    recipe_store_variants_per_dish: int = 3
+    recipe_prefetch_enabled: bool = False
+    recipe_prefetch_custom_keys: bool = False
+    recipe_prefetch_top_n: int = 2
+    recipe_prefetch_max_concurrency: int = 4
+    recipe_prefetch_ttl_seconds: int = 300
+    recipe_prefetch_max_users: int = 1000
+    jwks_refresh_seconds: int = 600
+    jwks_min_refresh_interval_seconds: int = 30
+    auth_cache_ttl_seconds: int = 60
+    auth_negative_cache_ttl_seconds: int = 10
+    auth_cache_max_entries: int = 10000
+    auth_clock_skew_seconds: int = 10
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
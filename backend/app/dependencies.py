@@ -1,11 +1,16 @@
 from uuid import UUID
 
-import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 
 from app.config import Settings, get_settings
+from app.services.token_verifier import (
+    AuthUnavailableError,
+    InvalidTokenError,
+    TokenVerifier,
+    get_token_verifier,
+)
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -16,9 +21,10 @@ class AuthUser(BaseModel):
     access_token: str
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
     settings: Settings = Depends(get_settings),
+    verifier: TokenVerifier = Depends(get_token_verifier),
 ) -> AuthUser:
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(
@@ -34,36 +40,20 @@ def get_current_user(
         )
 
     try:
-        response = httpx.get(
-            f"{settings.supabase_url}/auth/v1/user",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "apikey": settings.auth_api_key(),
-            },
-            timeout=10.0,
-        )
-    except httpx.HTTPError as exc:
+        identity = await verifier.verify(token)
+    except AuthUnavailableError as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Supabase auth service unavailable",
+            detail=str(exc),
         ) from exc
-
-    if response.status_code != status.HTTP_200_OK:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired access token",
-        )
-
-    payload = response.json()
-    user_id = payload.get("id")
-    if not user_id:
+    except InvalidTokenError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token payload missing user id",
-        )
+            detail=str(exc),
+        ) from exc
 
     return AuthUser(
-        id=UUID(user_id),
-        email=payload.get("email"),
+        id=identity.id,
+        email=identity.email,
         access_token=token,
     )
@@ -31,12 +31,23 @@ class PantryResponse(BaseModel):
     items: list[PantryIngredient]
 
 
+class PantryChangesResponse(BaseModel):
+    items: list[PantryIngredient]
+    next_token: str
+    full: bool = False
+
+
 class PantryToggleRequest(BaseModel):
     ingredient_id: int
     status: bool
     quantity: str | None = None
 
 
+class PantryBatchRequest(BaseModel):
+    changes: list[PantryToggleRequest] = Field(min_length=1, max_length=500)
+    full_reload: bool = False
+
+
 class IngredientSummary(BaseModel):
     id: int
     name: str
@@ -64,6 +75,7 @@ class Dish(BaseModel):
     match_score: int = Field(ge=0, le=100)
     missing_items: list[MissingItem]
     cooking_time: str
+    ingredients: list[str] = Field(default_factory=list)
 
 
 class ChatResponse(BaseModel):
@@ -78,12 +90,15 @@ class ChatMessageRequest(BaseModel):
     people_count: int | None = Field(default=None, ge=1)
     max_time_minutes: int | None = Field(default=None, ge=1, le=300)
     provider: Literal["groq"] = "groq"
+    stream: bool = False
 
 
 class RecipeAssistantRequest(BaseModel):
     dish_name: str
     question: str | None = None
     session_id: UUID | None = None
+    stream: bool = False
+    freshness: Literal["reuse", "regenerate"] = "reuse"
 
 
 class RecipeIngredient(BaseModel):
@@ -114,6 +129,7 @@ class RecipeDetail(BaseModel):
 class RecipeAssistantResponse(BaseModel):
     answer: str | None = None
     recipe: RecipeDetail | None = None
+    reused: bool = False
 
 
 class CookSessionCreateRequest(BaseModel):
@@ -136,14 +152,18 @@ class CookSessionResponse(BaseModel):
     recipe_snapshot: dict[str, Any] | None = None
     dish_card_snapshot: dict[str, Any] | None = None
     cooked_at: datetime
-    cooked_at_ist: str
-    cooked_day_ist: str
-    cooked_date_ist: str
-    cooked_time_ist: str
+    cooked_at_ist: str | None = None
+    cooked_day_ist: str | None = None
+    cooked_date_ist: str | None = None
+    cooked_time_ist: str | None = None
+
+
+HistoryFields = Literal["full", "summary"]
 
 
 class HistoryListResponse(BaseModel):
     items: list[CookSessionResponse]
+    next_cursor: str | None = None
 
 
 class FollowupMessage(BaseModel):
@@ -151,7 +171,7 @@ class FollowupMessage(BaseModel):
     question: str
     answer: str
     created_at: datetime
-    created_at_ist: str
+    created_at_ist: str | None = None
 
 
 class HistoryDetailResponse(BaseModel):
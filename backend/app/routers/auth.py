@@ -8,7 +8,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=AuthTokenResponse)
-def login(
+async def login(
     payload: AuthLoginRequest,
     settings: Settings = Depends(get_settings),
 ) -> AuthTokenResponse:
@@ -16,15 +16,15 @@ def login(
         raise HTTPException(status_code=500, detail="Supabase auth configuration is incomplete")
 
     try:
-        response = httpx.post(
-            f"{settings.supabase_url}/auth/v1/token?grant_type=password",
-            headers={
-                "apikey": settings.auth_api_key(),
-                "Content-Type": "application/json",
-            },
-            json={"email": payload.email, "password": payload.password},
-            timeout=15.0,
-        )
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.post(
+                f"{settings.supabase_url}/auth/v1/token?grant_type=password",
+                headers={
+                    "apikey": settings.auth_api_key(),
+                    "Content-Type": "application/json",
+                },
+                json={"email": payload.email, "password": payload.password},
+            )
     except httpx.HTTPError as exc:
         raise HTTPException(status_code=503, detail="Supabase auth service unavailable") from exc
 
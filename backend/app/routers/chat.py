@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+import asyncio
+from collections.abc import AsyncIterator
+from functools import lru_cache, partial
+from typing import Any
+from uuid import UUID
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.config import Settings, get_settings
 from app.dependencies import AuthUser, get_current_user
 from app.models.schemas import (
     ChatMessageRequest,
     ChatResponse,
+    PantryIngredient,
     RecipeAssistantRequest,
     RecipeAssistantResponse,
+    RecipeDetail,
 )
 from app.services.ai_service import AIService
+from app.services.audio_upload import AudioTooLargeError, receive_audio_upload
 from app.services.db_service import DBService
+from app.services.recipe_prefetch import get_recipe_prefetcher
+from app.services.recipe_store import get_recipe_store
+from app.services.streaming import sse_stream
+from app.services.timing import StageTimer
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+EMPTY_ASSISTANT_ANSWER = "I couldn't generate a recipe response. Please try again."
+
 
+@lru_cache
 def get_ai() -> AIService:
     return AIService()
 
@@ -21,14 +39,125 @@ def get_user_db(user: AuthUser = Depends(get_current_user)) -> DBService:
     return DBService(access_token=user.access_token)
 
 
+def event_stream_response(events: AsyncIterator[tuple[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def should_prefetch(settings: Settings, custom_api_key: str | None) -> bool:
+    return settings.recipe_prefetch_enabled and (
+        custom_api_key is None or settings.recipe_prefetch_custom_keys
+    )
+
+
+def schedule_recipe_prefetch(
+    ai: AIService,
+    user_id: UUID,
+    dishes: list[Any],
+    pantry_items: list[PantryIngredient],
+    custom_api_key: str | None,
+) -> None:
+    get_recipe_prefetcher().schedule(
+        user_id,
+        [dish["name"] if isinstance(dish, dict) else dish.name for dish in dishes],
+        partial(
+            ai.generate_recipe_assistant_answer,
+            question=None,
+            pantry_items=pantry_items,
+            custom_api_key=custom_api_key,
+        ),
+    )
+
+
+async def prefetch_after_cards(
+    events: AsyncIterator[tuple[str, Any]],
+    ai: AIService,
+    user_id: UUID,
+    pantry_items: list[PantryIngredient],
+    custom_api_key: str | None,
+) -> AsyncIterator[tuple[str, Any]]:
+    async for event, data in events:
+        yield event, data
+        if event == "done":
+            schedule_recipe_prefetch(ai, user_id, data["dishes"], pantry_items, custom_api_key)
+
+
+async def recipe_cards_response(
+    ai: AIService,
+    payload: ChatMessageRequest,
+    user_id: UUID,
+    user_text: str,
+    pantry_items: list[PantryIngredient],
+    custom_api_key: str | None,
+    timer: StageTimer,
+    response: Response,
+) -> ChatResponse | StreamingResponse:
+    options = {
+        "user_query": user_text,
+        "pantry_items": pantry_items,
+        "custom_api_key": custom_api_key,
+        "extra_budget_inr": payload.extra_budget_inr,
+        "people_count": payload.people_count,
+        "max_time_minutes": payload.max_time_minutes,
+    }
+    prefetch = should_prefetch(get_settings(), custom_api_key)
+    if prefetch:
+        get_recipe_prefetcher().cancel(user_id)
+    if payload.stream:
+        events = ai.stream_recipe_cards(**options)
+        if prefetch:
+            events = prefetch_after_cards(events, ai, user_id, pantry_items, custom_api_key)
+        streaming = event_stream_response(events)
+        timer.apply(streaming)
+        return streaming
+    result = await timer.measure("llm", ai.generate_recipe_cards(**options))
+    if prefetch:
+        schedule_recipe_prefetch(ai, user_id, result.dishes, pantry_items, custom_api_key)
+    timer.apply(response)
+    return result
+
+
+async def stored_recipe_events(recipe: RecipeDetail) -> AsyncIterator[tuple[str, Any]]:
+    for ingredient in recipe.ingredients:
+        yield "ingredient", ingredient.model_dump(mode="json")
+    for step in recipe.steps:
+        yield "step", step.model_dump(mode="json")
+    yield "done", RecipeAssistantResponse(recipe=recipe, reused=True).model_dump(mode="json")
+
+
+async def finish_assistant_stream(
+    events: AsyncIterator[tuple[str, Any]],
+    db: DBService,
+    user_id: UUID,
+    session_id: UUID | None,
+    question: str | None,
+) -> AsyncIterator[tuple[str, Any]]:
+    async for event, data in events:
+        if event == "done":
+            if session_id and question and data.get("answer"):
+                await db.create_cooking_followup(
+                    user_id=user_id,
+                    session_id=session_id,
+                    question=question,
+                    answer=data["answer"],
+                )
+            if not data.get("answer") and data.get("recipe") is None:
+                data = RecipeAssistantResponse(answer=EMPTY_ASSISTANT_ANSWER).model_dump(mode="json")
+        yield event, data
+
+
 @router.post("/message", response_model=ChatResponse)
-def post_message(
+async def post_message(
     payload: ChatMessageRequest,
+    response: Response,
     user: AuthUser = Depends(get_current_user),
     ai: AIService = Depends(get_ai),
     db: DBService = Depends(get_user_db),
     x_custom_api_key: str | None = Header(default=None),
-) -> ChatResponse:
+) -> ChatResponse | StreamingResponse:
     if payload.provider != "groq":
         raise HTTPException(status_code=400, detail="Unsupported provider")
 
@@ -36,20 +165,99 @@ def post_message(
     if not user_text and not payload.audio_base64:
         raise HTTPException(status_code=400, detail="Provide either text or audio_base64")
 
+    timer = StageTimer()
     try:
-        db.ensure_profile(user.id)
-        pantry_items = db.get_pantry(user.id)
+        if user_text:
+            _, pantry_items = await asyncio.gather(
+                timer.measure("profile", db.ensure_profile(user.id)),
+                timer.measure("pantry", db.get_stocked_pantry(user.id)),
+            )
+        else:
+            _, pantry_items, user_text = await asyncio.gather(
+                timer.measure("profile", db.ensure_profile(user.id)),
+                timer.measure("pantry", db.get_stocked_pantry(user.id)),
+                timer.measure(
+                    "transcribe", ai.transcribe_audio(payload.audio_base64 or "", x_custom_api_key)
+                ),
+            )
 
-        if not user_text and payload.audio_base64:
-            user_text = ai.transcribe_audio(payload.audio_base64, x_custom_api_key)
+        return await recipe_cards_response(
+            ai,
+            payload,
+            user_id=user.id,
+            user_text=user_text or "",
+            pantry_items=pantry_items,
+            custom_api_key=x_custom_api_key,
+            timer=timer,
+            response=response,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-        return ai.generate_recipe_cards(
-            user_query=user_text or "",
+
+@router.post("/message/audio", response_model=ChatResponse)
+async def post_audio_message(
+    request: Request,
+    response: Response,
+    extra_budget_inr: str | None = Query(default=None),
+    people_count: int | None = Query(default=None, ge=1),
+    max_time_minutes: int | None = Query(default=None, ge=1, le=300),
+    stream: bool = Query(default=False),
+    user: AuthUser = Depends(get_current_user),
+    ai: AIService = Depends(get_ai),
+    db: DBService = Depends(get_user_db),
+    settings: Settings = Depends(get_settings),
+    x_custom_api_key: str | None = Header(default=None),
+) -> ChatResponse | StreamingResponse:
+    payload = ChatMessageRequest(
+        extra_budget_inr=extra_budget_inr,
+        people_count=people_count,
+        max_time_minutes=max_time_minutes,
+        stream=stream,
+    )
+    timer = StageTimer()
+    try:
+        upload = await timer.measure(
+            "upload",
+            receive_audio_upload(
+                request,
+                max_bytes=settings.audio_upload_max_bytes,
+                memory_bytes=settings.audio_upload_memory_bytes,
+            ),
+        )
+    except AudioTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    try:
+        _, pantry_items, user_text = await asyncio.gather(
+            timer.measure("profile", db.ensure_profile(user.id)),
+            timer.measure("pantry", db.get_stocked_pantry(user.id)),
+            timer.measure(
+                "transcribe",
+                ai.transcribe_audio_file(upload.file, x_custom_api_key, filename=upload.filename),
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        upload.close()
+
+    try:
+        return await recipe_cards_response(
+            ai,
+            payload,
+            user_id=user.id,
+            user_text=user_text,
             pantry_items=pantry_items,
             custom_api_key=x_custom_api_key,
-            extra_budget_inr=payload.extra_budget_inr,
-            people_count=payload.people_count,
-            max_time_minutes=payload.max_time_minutes,
+            timer=timer,
+            response=response,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -58,36 +266,70 @@ def post_message(
 
 
 @router.post("/recipe-assistant", response_model=RecipeAssistantResponse)
-def recipe_assistant(
+async def recipe_assistant(
     payload: RecipeAssistantRequest,
     user: AuthUser = Depends(get_current_user),
     ai: AIService = Depends(get_ai),
     db: DBService = Depends(get_user_db),
     x_custom_api_key: str | None = Header(default=None),
-) -> RecipeAssistantResponse:
-    if not payload.dish_name.strip():
+) -> RecipeAssistantResponse | StreamingResponse:
+    dish_name = payload.dish_name.strip()
+    if not dish_name:
         raise HTTPException(status_code=400, detail="dish_name is required")
+    reuse = payload.freshness == "reuse" and not (payload.question and payload.question.strip())
 
     try:
-        db.ensure_profile(user.id)
-        pantry_items = db.get_pantry(user.id)
-        answer = ai.generate_recipe_assistant_answer(
-            dish_name=payload.dish_name.strip(),
+        if reuse:
+            _, pantry_items, snapshots = await asyncio.gather(
+                db.ensure_profile(user.id),
+                db.get_stocked_pantry(user.id),
+                db.list_recipe_snapshots(user.id, dish_name),
+            )
+            prefetched = await get_recipe_prefetcher().take(user.id, dish_name)
+            stored = (prefetched.recipe if prefetched else None) or get_recipe_store().find(
+                dish_name, pantry_items, snapshots
+            )
+            if stored is not None:
+                if payload.stream:
+                    return event_stream_response(stored_recipe_events(stored))
+                return RecipeAssistantResponse(recipe=stored, reused=True)
+        else:
+            _, pantry_items = await asyncio.gather(
+                db.ensure_profile(user.id),
+                db.get_stocked_pantry(user.id),
+            )
+        if payload.stream:
+            events = ai.stream_recipe_assistant_answer(
+                dish_name=dish_name,
+                question=payload.question,
+                pantry_items=pantry_items,
+                custom_api_key=x_custom_api_key,
+            )
+            return event_stream_response(
+                finish_assistant_stream(
+                    events,
+                    db=db,
+                    user_id=user.id,
+                    session_id=payload.session_id,
+                    question=payload.question,
+                )
+            )
+
+        answer = await ai.generate_recipe_assistant_answer(
+            dish_name=dish_name,
             question=payload.question,
             pantry_items=pantry_items,
             custom_api_key=x_custom_api_key,
         )
         if payload.session_id and payload.question and answer.answer:
-            db.create_cooking_followup(
+            await db.create_cooking_followup(
                 user_id=user.id,
                 session_id=payload.session_id,
                 question=payload.question,
                 answer=answer.answer,
             )
         if not answer.answer and answer.recipe is None:
-            return RecipeAssistantResponse(
-                answer="I couldn't generate a recipe response. Please try again."
-            )
+            return RecipeAssistantResponse(answer=EMPTY_ASSISTANT_ANSWER)
         return answer
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
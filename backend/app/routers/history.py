@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from functools import partial
 from uuid import UUID
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+
 from app.dependencies import AuthUser, get_current_user
 from app.models.schemas import (
     CookSessionCreateRequest,
     CookSessionResponse,
     HistoryDetailResponse,
+    HistoryFields,
     HistoryListResponse,
 )
 from app.services.db_service import DBService
+from app.services.etag import conditional_headers, etag_matches, not_modified
 
 router = APIRouter(prefix="/history", tags=["history"])
 
@@ -18,7 +23,7 @@ def get_user_db(user: AuthUser = Depends(get_current_user)) -> DBService:
 
 
 @router.post("/cooked", response_model=CookSessionResponse)
-def create_cooked_session(
+async def create_cooked_session(
     payload: CookSessionCreateRequest,
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
@@ -26,8 +31,8 @@ def create_cooked_session(
     if not payload.dish_name.strip():
         raise HTTPException(status_code=400, detail="dish_name is required")
     try:
-        db.ensure_profile(user.id)
-        return db.create_cooking_session(
+        await db.ensure_profile(user.id)
+        return await db.create_cooking_session(
             user_id=user.id,
             dish_name=payload.dish_name,
             source_query=payload.source_query,
@@ -42,28 +47,58 @@ def create_cooked_session(
 
 
 @router.get("", response_model=HistoryListResponse)
-def list_history(
+async def list_history(
+    response: Response,
     limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    fields: HistoryFields = Query(default="full"),
+    include_ist: bool = Query(default=True),
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
-) -> HistoryListResponse:
+    if_none_match: str | None = Header(default=None),
+) -> HistoryListResponse | Response:
+    list_sessions = partial(
+        db.list_cooking_sessions,
+        user_id=user.id,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        include_ist=include_ist,
+    )
     try:
-        db.ensure_profile(user.id)
-        items = db.list_cooking_sessions(user_id=user.id, limit=limit)
-        return HistoryListResponse(items=items)
+        if if_none_match:
+            _, etag = await asyncio.gather(
+                db.ensure_profile(user.id),
+                db.history_etag(user.id, limit, cursor, fields, include_ist),
+            )
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            history, etag = await list_sessions()
+        else:
+            _, (history, etag) = await asyncio.gather(db.ensure_profile(user.id), list_sessions())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    response.headers.update(conditional_headers(etag))
+    return history
 
 
 @router.get("/{session_id}", response_model=HistoryDetailResponse)
-def get_history_detail(
+async def get_history_detail(
     session_id: UUID,
+    include_ist: bool = Query(default=True),
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
 ) -> HistoryDetailResponse:
     try:
-        db.ensure_profile(user.id)
-        return db.get_cooking_session_detail(user_id=user.id, session_id=session_id)
+        _, detail = await asyncio.gather(
+            db.ensure_profile(user.id),
+            db.get_cooking_session_detail(
+                user_id=user.id, session_id=session_id, include_ist=include_ist
+            ),
+        )
+        return detail
     except RuntimeError as exc:
         if "not found" in str(exc).lower():
             raise HTTPException(status_code=404, detail="History session not found") from exc
@@ -1,7 +1,14 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.dependencies import AuthUser, get_current_user
-from app.models.schemas import IngredientCreateRequest, IngredientListResponse, IngredientSummary
+from app.models.schemas import (
+    IngredientCategory,
+    IngredientCreateRequest,
+    IngredientListResponse,
+    IngredientSummary,
+)
 from app.services.db_service import DBService
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
@@ -12,22 +19,25 @@ def get_user_db(user: AuthUser = Depends(get_current_user)) -> DBService:
 
 
 @router.get("", response_model=IngredientListResponse)
-def list_ingredients(
+async def list_ingredients(
     search: str | None = Query(default=None, min_length=1, max_length=100),
     limit: int = Query(default=50, ge=1, le=200),
+    category: IngredientCategory | None = Query(default=None),
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
 ) -> IngredientListResponse:
     try:
-        db.ensure_profile(user.id)
-        items = db.list_ingredients(search=search, limit=limit)
+        _, items = await asyncio.gather(
+            db.ensure_profile(user.id),
+            db.list_ingredients(search=search, limit=limit, category=category),
+        )
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return IngredientListResponse(items=items)
 
 
 @router.post("", response_model=IngredientSummary)
-def create_ingredient(
+async def create_ingredient(
     payload: IngredientCreateRequest,
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
@@ -36,8 +46,8 @@ def create_ingredient(
         raise HTTPException(status_code=400, detail="name, category, and default_unit are required")
 
     try:
-        db.ensure_profile(user.id)
-        ingredient = db.create_ingredient(
+        await db.ensure_profile(user.id)
+        ingredient = await db.create_ingredient(
             name=payload.name,
             category=payload.category,
             default_unit=payload.default_unit,
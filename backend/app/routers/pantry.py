@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 
 from app.dependencies import AuthUser, get_current_user
-from app.models.schemas import PantryResponse, PantryToggleRequest
+from app.models.schemas import (
+    PantryBatchRequest,
+    PantryChangesResponse,
+    PantryResponse,
+    PantryToggleRequest,
+)
 from app.services.db_service import DBService
+from app.services.etag import conditional_headers, etag_matches, not_modified
 
 router = APIRouter(prefix="/pantry", tags=["pantry"])
 
@@ -12,36 +20,77 @@ def get_user_db(user: AuthUser = Depends(get_current_user)) -> DBService:
 
 
 @router.get("", response_model=PantryResponse)
-def get_pantry(
+async def get_pantry(
+    response: Response,
+    in_stock_only: bool = Query(default=False),
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
-) -> PantryResponse:
+    if_none_match: str | None = Header(default=None),
+) -> PantryResponse | Response:
     try:
-        db.ensure_profile(user.id)
-        items = db.get_pantry(user.id)
+        if if_none_match:
+            _, etag = await asyncio.gather(
+                db.ensure_profile(user.id), db.pantry_etag(user.id, in_stock_only)
+            )
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            state = await db.get_pantry_state(user.id)
+        else:
+            _, state = await asyncio.gather(
+                db.ensure_profile(user.id), db.get_pantry_state(user.id)
+            )
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    response.headers.update(conditional_headers(db.pantry_state_etag(state, in_stock_only)))
+    items = state.to_models(state.stocked_positions() if in_stock_only else None)
     return PantryResponse(items=items)
 
 
+@router.get("/changes", response_model=PantryChangesResponse)
+async def get_pantry_changes(
+    since: str | None = Query(default=None),
+    user: AuthUser = Depends(get_current_user),
+    db: DBService = Depends(get_user_db),
+) -> PantryChangesResponse:
+    try:
+        _, changes = await asyncio.gather(
+            db.ensure_profile(user.id),
+            db.get_pantry_changes(user.id, since=since),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return changes
+
+
 @router.post("/toggle", response_model=PantryResponse)
-def toggle_pantry_item(
+async def toggle_pantry_item(
     payload: PantryToggleRequest,
     user: AuthUser = Depends(get_current_user),
     db: DBService = Depends(get_user_db),
 ) -> PantryResponse:
-    body = payload.model_dump(exclude_unset=True)
-    quantity_provided = "quantity" in body
     try:
-        db.ensure_profile(user.id)
-        db.upsert_pantry_item(
-            user_id=user.id,
-            ingredient_id=payload.ingredient_id,
-            is_in_stock=payload.status,
-            quantity=payload.quantity,
-            quantity_provided=quantity_provided,
-        )
-        items = db.get_pantry(user.id)
+        await db.ensure_profile(user.id)
+        await db.upsert_pantry_items([payload.model_dump(exclude_unset=True)])
+        state = await db.get_pantry_state(user.id)
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return PantryResponse(items=state.to_models())
+
+
+@router.post("/batch", response_model=PantryResponse)
+async def batch_update_pantry(
+    payload: PantryBatchRequest,
+    user: AuthUser = Depends(get_current_user),
+    db: DBService = Depends(get_user_db),
+) -> PantryResponse:
+    changes = [change.model_dump(exclude_unset=True) for change in payload.changes]
+    try:
+        await db.ensure_profile(user.id)
+        items = await db.upsert_pantry_items(changes)
+        if payload.full_reload:
+            items = (await db.get_pantry_state(user.id)).to_models()
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return PantryResponse(items=items)
@@ -2,13 +2,28 @@ from __future__ import annotations
 
 import base64
 import json
-import re
-from typing import Any
-
-from groq import Groq
+from collections.abc import AsyncIterator
+from functools import lru_cache, partial
+from typing import IO, Any
 
 from app.config import get_settings
 from app.models.schemas import ChatResponse, PantryIngredient, RecipeAssistantResponse, RecipeDetail
+from app.services.cache import SingleFlight
+from app.services.dish_ranking import get_dish_ranker
+from app.services.groq_pool import get_groq_pool
+from app.services.match_scoring import PantryMatcher
+from app.services.recipe_store import get_recipe_store
+from app.services.response_cache import ResponseCache, get_response_cache
+from app.services.streaming import JsonArrayStreamer
+from app.services.transcription_cache import get_transcription_cache
+
+CHAT_MODEL = "openai/gpt-oss-120b"
+TRANSCRIPTION_MODEL = "whisper-large-v3"
+
+
+@lru_cache
+def get_llm_flights() -> SingleFlight[str, str]:
+    return SingleFlight()
 
 
 class AIService:
@@ -21,17 +36,34 @@ class AIService:
             raise ValueError("No Groq API key provided")
         return api_key
 
-    def transcribe_audio(self, audio_base64: str, custom_api_key: str | None) -> str:
+    async def transcribe_audio(self, audio_base64: str, custom_api_key: str | None) -> str:
+        return await self.transcribe_audio_file(base64.b64decode(audio_base64), custom_api_key)
+
+    async def transcribe_audio_file(
+        self,
+        audio: bytes | IO[bytes],
+        custom_api_key: str | None,
+        filename: str = "audio.wav",
+    ) -> str:
         api_key = self._resolve_api_key(custom_api_key)
-        audio_bytes = base64.b64decode(audio_base64)
-        client = Groq(api_key=api_key)
-        transcript = client.audio.transcriptions.create(
-            file=("audio.wav", audio_bytes),
-            model="whisper-large-v3",
+        cache = get_transcription_cache()
+        key = await cache.key_for(TRANSCRIPTION_MODEL, audio)
+
+        async def transcribe() -> str:
+            client = get_groq_pool().client_for(api_key)
+            transcript = await client.audio.transcriptions.create(
+                file=(filename, audio),
+                model=TRANSCRIPTION_MODEL,
+            )
+            return transcript.text
+
+        # A shared call would read the leading request's upload, which that request
+        # closes when it finishes or disconnects; only in-memory audio is shared.
+        return await cache.get_or_transcribe(
+            key, transcribe, coalesce=isinstance(audio, (bytes, bytearray, memoryview))
         )
-        return transcript.text
 
-    def generate_recipe_cards(
+    async def generate_recipe_cards(
         self,
         user_query: str,
         pantry_items: list[PantryIngredient],
@@ -41,61 +73,177 @@ class AIService:
         max_time_minutes: int | None = None,
     ) -> ChatResponse:
         api_key = self._resolve_api_key(custom_api_key)
-        client = Groq(api_key=api_key)
+        pantry_list = self._pantry_list(pantry_items)
+
+        cache = get_response_cache() if self.settings.response_cache_enabled else None
+        cache_key = self._recipe_cards_cache_key(user_query, pantry_list, people_count)
+        data = await cache.get(cache_key) if cache is not None else None
+        if data is None:
+            content = await self._chat_completion(
+                api_key,
+                self._recipe_cards_messages(user_query, pantry_list, people_count),
+                json_mode=True,
+            )
+            data = self._parse_recipe_cards(content, self._pantry_matcher(pantry_items))
+            if cache is not None:
+                await cache.set(cache_key, data)
+
+        data = self._rank_dishes(data, max_time_minutes, extra_budget_inr)
+        return ChatResponse.model_validate(data)
+
+    async def stream_recipe_cards(
+        self,
+        user_query: str,
+        pantry_items: list[PantryIngredient],
+        custom_api_key: str | None,
+        extra_budget_inr: str | None = None,
+        people_count: int | None = None,
+        max_time_minutes: int | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        api_key = self._resolve_api_key(custom_api_key)
+        pantry_list = self._pantry_list(pantry_items)
+
+        cache = get_response_cache() if self.settings.response_cache_enabled else None
+        cache_key = self._recipe_cards_cache_key(user_query, pantry_list, people_count)
+        data = await cache.get(cache_key) if cache is not None else None
+        if data is None:
+            matcher = self._pantry_matcher(pantry_items)
+            streamer = JsonArrayStreamer({"dishes"})
+            async for delta in self._stream_chat_completion(
+                api_key,
+                self._recipe_cards_messages(user_query, pantry_list, people_count),
+                json_mode=True,
+            ):
+                for _, dish in streamer.feed(delta):
+                    normalized = self._normalize_chat_payload({"dishes": [dish]})["dishes"][0]
+                    yield "dish", matcher.score_dish(normalized)
+            data = self._parse_recipe_cards(streamer.text, matcher)
+            if cache is not None:
+                await cache.set(cache_key, data)
+        else:
+            for dish in data["dishes"]:
+                yield "dish", dish
 
-        pantry_list = [
+        data = self._rank_dishes(data, max_time_minutes, extra_budget_inr)
+        yield "done", ChatResponse.model_validate(data).model_dump(mode="json")
+
+    def _pantry_list(self, pantry_items: list[PantryIngredient]) -> list[str]:
+        return [
             f"{item.name} ({item.quantity or 'unspecified quantity'})"
             for item in pantry_items
             if item.is_in_stock
         ]
 
+    def _pantry_matcher(self, pantry_items: list[PantryIngredient]) -> PantryMatcher:
+        return PantryMatcher(item.name for item in pantry_items if item.is_in_stock)
+
+    def _recipe_cards_cache_key(
+        self,
+        user_query: str,
+        pantry_list: list[str],
+        people_count: int | None,
+    ) -> str:
+        # Time and budget only rank the candidates, so they stay out of the key and a
+        # cached set is re-ranked for new constraints without another LLM call.
+        return ResponseCache.make_key(
+            "recipe_cards:v3",
+            {
+                "pantry": sorted(entry.lower() for entry in pantry_list),
+                "query": " ".join(user_query.lower().split()),
+                "people_count": people_count,
+            },
+        )
+
+    def _recipe_cards_messages(
+        self,
+        user_query: str,
+        pantry_list: list[str],
+        people_count: int | None,
+    ) -> list[dict[str, str]]:
         system_prompt = (
             "Role: You are PantryPilot, a smart cooking assistant. "
             "Return strict JSON only. Keys: thought (string), dishes (array). "
-            "Each dish needs name, match_score (0-100), missing_items (name,cost_est), "
-            "and cooking_time. Use INR currency when estimating costs."
+            "Each dish needs name, cooking_time and ingredients: every ingredient the dish "
+            "needs as {name, cost_est}, where cost_est is the INR cost to buy it and is only "
+            "required for items not in the user's inventory. Use plain ingredient names."
         )
 
-        budget_line = (
-            f"Extra Budget (INR): {extra_budget_inr}\n"
-            if extra_budget_inr and extra_budget_inr.strip()
-            else ""
-        )
         people_line = (
             f"People to cook for: {people_count}\n"
             if people_count is not None and people_count > 0
             else ""
         )
-        max_time_line = (
-            f"Maximum time user wants to spend: {max_time_minutes} minutes\n"
-            if max_time_minutes is not None and max_time_minutes > 0
-            else ""
-        )
 
         user_prompt = (
             f"User Inventory: {pantry_list}\n"
             f"User Query: {user_query}\n"
-            f"{budget_line}"
             f"{people_line}"
-            f"{max_time_line}"
-            "Suggest 2 to 5 dishes based strictly on inventory + query."
+            "Suggest 4 to 8 dishes based strictly on inventory + query, ranging from quick "
+            "dishes under 20 minutes to longer ones and from no extra spend to a few "
+            "bought ingredients."
+        )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _parse_recipe_cards(self, content: str | None, matcher: PantryMatcher) -> dict[str, Any]:
+        data = json.loads(content or "{}")
+        data = self._normalize_chat_payload(data)
+        for dish in data.get("dishes") or []:
+            if isinstance(dish, dict):
+                matcher.score_dish(dish)
+        return ChatResponse.model_validate(data).model_dump(mode="json")
+
+    async def _chat_completion(
+        self,
+        api_key: str,
+        messages: list[dict[str, str]],
+        json_mode: bool = False,
+    ) -> str:
+        key = ResponseCache.make_key(
+            "chat_completion",
+            {"api_key": api_key, "model": CHAT_MODEL, "messages": messages, "json_mode": json_mode},
+        )
+        return await get_llm_flights().do(
+            key, partial(self._create_chat_completion, api_key, messages, json_mode)
         )
 
-        completion = client.chat.completions.create(
-            model="openai/gpt-oss-120b",
+    async def _create_chat_completion(
+        self,
+        api_key: str,
+        messages: list[dict[str, str]],
+        json_mode: bool,
+    ) -> str:
+        client = get_groq_pool().client_for(api_key)
+        completion = await client.chat.completions.create(
+            model=CHAT_MODEL,
             temperature=0.2,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=messages,
+            **({"response_format": {"type": "json_object"}} if json_mode else {}),
         )
+        return completion.choices[0].message.content or ""
 
-        content = completion.choices[0].message.content
-        data = json.loads(content)
-        data = self._normalize_chat_payload(data)
-        data = self._apply_time_preference_ranking(data, max_time_minutes=max_time_minutes)
-        return ChatResponse.model_validate(data)
+    async def _stream_chat_completion(
+        self,
+        api_key: str,
+        messages: list[dict[str, str]],
+        json_mode: bool = False,
+    ) -> AsyncIterator[str]:
+        client = get_groq_pool().client_for(api_key)
+        stream = await client.chat.completions.create(
+            model=CHAT_MODEL,
+            temperature=0.2,
+            messages=messages,
+            stream=True,
+            **({"response_format": {"type": "json_object"}} if json_mode else {}),
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
 
     def _normalize_chat_payload(self, data: dict) -> dict:
         dishes = data.get("dishes")
@@ -120,72 +268,17 @@ class AIService:
 
         return data
 
-    def _apply_time_preference_ranking(self, data: dict, max_time_minutes: int | None) -> dict:
-        if max_time_minutes is None:
-            return data
-
+    def _rank_dishes(
+        self, data: dict, max_time_minutes: int | None, extra_budget_inr: str | None
+    ) -> dict:
         dishes = data.get("dishes")
-        if not isinstance(dishes, list):
-            return data
-
-        under: list[tuple[float, int, dict[str, Any]]] = []
-        over: list[tuple[float, int, dict[str, Any]]] = []
-        unknown: list[tuple[int, dict[str, Any]]] = []
-
-        for index, dish in enumerate(dishes):
-            if not isinstance(dish, dict):
-                continue
-            minutes = self._extract_minutes(dish.get("cooking_time"))
-            if minutes is None:
-                unknown.append((index, dish))
-                continue
-            score = abs(minutes - max_time_minutes)
-            if minutes <= max_time_minutes:
-                under.append((score, index, dish))
-            else:
-                over.append((score, index, dish))
-
-        under.sort(key=lambda item: (item[0], item[1]))
-        over.sort(key=lambda item: (item[0], item[1]))
-
-        ordered = [dish for _, _, dish in under]
-        if over:
-            ordered.append(over[0][2])
-        ordered.extend(dish for _, dish in unknown)
-
-        if ordered:
-            data["dishes"] = ordered[:5]
+        if isinstance(dishes, list) and dishes:
+            data["dishes"] = get_dish_ranker().rank(
+                dishes, max_time_minutes=max_time_minutes, extra_budget_inr=extra_budget_inr
+            )
         return data
 
-    def _extract_minutes(self, raw: Any) -> int | None:
-        if raw is None:
-            return None
-        text = str(raw).strip().lower()
-        if not text:
-            return None
-
-        minutes = 0
-        matched = False
-
-        hour_match = re.search(r"(\d+)\s*(h|hr|hrs|hour|hours)", text)
-        if hour_match:
-            minutes += int(hour_match.group(1)) * 60
-            matched = True
-
-        minute_match = re.search(r"(\d+)\s*(m|min|mins|minute|minutes)", text)
-        if minute_match:
-            minutes += int(minute_match.group(1))
-            matched = True
-
-        if matched:
-            return minutes
-
-        digits = re.search(r"\d+", text)
-        if digits:
-            return int(digits.group(0))
-        return None
-
-    def generate_recipe_assistant_answer(
+    async def generate_recipe_assistant_answer(
         self,
         dish_name: str,
         question: str | None,
@@ -193,13 +286,63 @@ class AIService:
         custom_api_key: str | None,
     ) -> RecipeAssistantResponse:
         api_key = self._resolve_api_key(custom_api_key)
-        client = Groq(api_key=api_key)
+        messages, json_mode = self._recipe_assistant_messages(
+            dish_name, question, self._pantry_list(pantry_items)
+        )
+        content = await self._chat_completion(api_key, messages, json_mode=json_mode)
+        if json_mode:
+            response = self._parse_recipe(content)
+            self._remember_recipe(dish_name, pantry_items, response)
+            return response
+        return RecipeAssistantResponse(answer=content.strip())
+
+    async def stream_recipe_assistant_answer(
+        self,
+        dish_name: str,
+        question: str | None,
+        pantry_items: list[PantryIngredient],
+        custom_api_key: str | None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        api_key = self._resolve_api_key(custom_api_key)
+        messages, json_mode = self._recipe_assistant_messages(
+            dish_name, question, self._pantry_list(pantry_items)
+        )
+        if not json_mode:
+            parts: list[str] = []
+            async for delta in self._stream_chat_completion(api_key, messages):
+                parts.append(delta)
+                yield "token", {"delta": delta}
+            yield "done", RecipeAssistantResponse(answer="".join(parts).strip()).model_dump(mode="json")
+            return
+
+        streamer = JsonArrayStreamer({"ingredients", "steps"})
+        emitted = {"ingredients": 0, "steps": 0}
+        async for delta in self._stream_chat_completion(api_key, messages, json_mode=True):
+            for key, value in streamer.feed(delta):
+                emitted[key] += 1
+                if key == "steps" and isinstance(value, dict):
+                    value.setdefault("step_number", emitted[key])
+                normalized = self._normalize_recipe_payload({key: [value]})[key][0]
+                yield ("ingredient" if key == "ingredients" else "step"), normalized
+        response = self._parse_recipe(streamer.text)
+        self._remember_recipe(dish_name, pantry_items, response)
+        yield "done", response.model_dump(mode="json")
+
+    def _remember_recipe(
+        self,
+        dish_name: str,
+        pantry_items: list[PantryIngredient],
+        response: RecipeAssistantResponse,
+    ) -> None:
+        if response.recipe is not None:
+            get_recipe_store().remember(dish_name, pantry_items, response.recipe)
 
-        pantry_list = [
-            f"{item.name} ({item.quantity or 'unspecified quantity'})"
-            for item in pantry_items
-            if item.is_in_stock
-        ]
+    def _recipe_assistant_messages(
+        self,
+        dish_name: str,
+        question: str | None,
+        pantry_list: list[str],
+    ) -> tuple[list[dict[str, str]], bool]:
         user_question = question.strip() if question else ""
 
         if user_question:
@@ -208,25 +351,9 @@ class AIService:
                 f"User follow-up question: {user_question}\n"
                 "Answer specifically for this dish in concise steps and practical guidance."
             )
-            completion = client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                temperature=0.2,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are PantryPilot's recipe assistant. Give clear, usable cooking guidance. "
-                            "Keep tone concise and practical."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Pantry in-stock items: {pantry_list}\n\n{task}",
-                    },
-                ],
-            )
-            return RecipeAssistantResponse(
-                answer=(completion.choices[0].message.content or "").strip()
+            system_prompt = (
+                "You are PantryPilot's recipe assistant. Give clear, usable cooking guidance. "
+                "Keep tone concise and practical."
             )
         else:
             task = (
@@ -234,32 +361,26 @@ class AIService:
                 "Provide a complete practical recipe including ingredients, steps, "
                 "time, tips, and substitutions based on user's pantry."
             )
-            completion = client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                temperature=0.2,
-                response_format={"type": "json_object"},
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Role: Expert Chef. Output STRICT JSON only. "
-                            "Schema: {title, description, prep_time_minutes (int), cook_time_minutes (int), "
-                            "servings (int), difficulty (Easy/Medium/Hard), calories_per_serving (int|null), "
-                            "ingredients: [{name, quantity, notes}], "
-                            "steps: [{step_number, instruction, timer_seconds (int|null)}], "
-                            "chef_tips: [str]}"
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Pantry in-stock items: {pantry_list}\n\n{task}",
-                    },
-                ],
+            system_prompt = (
+                "Role: Expert Chef. Output STRICT JSON only. "
+                "Schema: {title, description, prep_time_minutes (int), cook_time_minutes (int), "
+                "servings (int), difficulty (Easy/Medium/Hard), calories_per_serving (int|null), "
+                "ingredients: [{name, quantity, notes}], "
+                "steps: [{step_number, instruction, timer_seconds (int|null)}], "
+                "chef_tips: [str]}"
             )
-            data = json.loads(completion.choices[0].message.content or "{}")
-            normalized = self._normalize_recipe_payload(data)
-            recipe = RecipeDetail.model_validate(normalized)
-            return RecipeAssistantResponse(recipe=recipe)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Pantry in-stock items: {pantry_list}\n\n{task}"},
+        ]
+        return messages, not user_question
+
+    def _parse_recipe(self, content: str | None) -> RecipeAssistantResponse:
+        data = json.loads(content or "{}")
+        normalized = self._normalize_recipe_payload(data)
+        recipe = RecipeDetail.model_validate(normalized)
+        return RecipeAssistantResponse(recipe=recipe)
 
     def _normalize_recipe_payload(self, data: dict) -> dict:
         normalized = dict(data)
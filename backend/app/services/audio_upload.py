@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.types import Message, Receive
+
+DEFAULT_AUDIO_FILENAME = "audio.wav"
+# Whisper picks the decoder from the extension, so map only formats Groq accepts.
+AUDIO_EXTENSIONS = {
+    "audio/webm": ".webm",
+    "video/webm": ".webm",
+    "audio/ogg": ".ogg",
+    "audio/opus": ".opus",
+    "audio/mp4": ".m4a",
+    "audio/m4a": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "video/mp4": ".mp4",
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/wav": ".wav",
+    "audio/wave": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/flac": ".flac",
+    "audio/x-flac": ".flac",
+}
+ACCEPTED_EXTENSIONS = frozenset({*AUDIO_EXTENSIONS.values(), ".mpeg", ".mpga"})
+
+
+class AudioTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class AudioUpload:
+    file: IO[bytes]
+    filename: str
+    size: int
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _filename_for(content_type: str | None, filename: str | None = None) -> str:
+    if filename and os.path.splitext(filename)[1].lower() in ACCEPTED_EXTENSIONS:
+        return os.path.basename(filename)
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    extension = AUDIO_EXTENSIONS.get(media_type)
+    return f"audio{extension}" if extension else DEFAULT_AUDIO_FILENAME
+
+
+def check_declared_size(request: Request, max_bytes: int) -> None:
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise AudioTooLargeError(f"Audio upload exceeds {max_bytes} bytes")
+
+
+def limit_receive(receive: Receive, max_bytes: int) -> Receive:
+    received = 0
+
+    async def limited() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise AudioTooLargeError(f"Audio upload exceeds {max_bytes} bytes")
+        return message
+
+    return limited
+
+
+async def receive_audio_upload(request: Request, max_bytes: int, memory_bytes: int) -> AudioUpload:
+    check_declared_size(request, max_bytes)
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        # Starlette buffers file parts without a size cap, so the limit has to sit on
+        # the raw receive channel for chunked bodies with no Content-Length.
+        limited = Request(request.scope, limit_receive(request.receive, max_bytes))
+        form = await limited.form(max_files=1, max_fields=8)
+        upload = form.get("audio")
+        if not isinstance(upload, UploadFile):
+            raise ValueError("Multipart upload must include an 'audio' file field")
+        upload.file.seek(0, os.SEEK_END)
+        size = upload.file.tell()
+        if size > max_bytes:
+            await upload.close()
+            raise AudioTooLargeError(f"Audio upload exceeds {max_bytes} bytes")
+        upload.file.seek(0)
+        return AudioUpload(
+            upload.file,
+            _filename_for(upload.content_type, upload.filename),
+            size,
+        )
+
+    spool: IO[bytes] = SpooledTemporaryFile(max_size=memory_bytes)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise AudioTooLargeError(f"Audio upload exceeds {max_bytes} bytes")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    if size == 0:
+        spool.close()
+        raise ValueError("Audio upload is empty")
+    spool.seek(0)
+    return AudioUpload(spool, _filename_for(content_type), size)
@@ -1,124 +1,212 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import base64
+import json
+import re
+from functools import partial
 from typing import Any
 from uuid import UUID
-from zoneinfo import ZoneInfo
 
-from supabase import Client, create_client
+from postgrest import AsyncPostgrestClient, CountMethod
 
-from app.config import get_settings
 from app.models.schemas import (
     CookSessionResponse,
     FollowupMessage,
     HistoryDetailResponse,
+    HistoryFields,
+    HistoryListResponse,
     IngredientSummary,
+    PantryChangesResponse,
     PantryIngredient,
 )
+from app.services.etag import make_etag
+from app.services.ingredient_catalog import CatalogSnapshot, get_ingredient_catalog
+from app.services.match_scoring import ingredient_key
+from app.services.pantry_state import PantryState
+from app.services.profile_registry import get_profile_registry
+from app.services.supabase_pool import get_supabase_pool
+from app.services.time_format import ist_labels, parse_timestamptz
+
+_LIKE_WILDCARDS = re.compile(r"[%*_\\]")
+
+SESSION_SUMMARY_COLUMNS = (
+    "id,dish_name,source_query,people_count,extra_budget_inr,max_time_minutes,cooked_at"
+)
+SESSION_COLUMNS = f"{SESSION_SUMMARY_COLUMNS},recipe_snapshot,dish_card_snapshot"
+
+
+def encode_history_cursor(cooked_at: str, session_id: str) -> str:
+    raw = json.dumps([cooked_at, session_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[str, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cooked_at, session_id = json.loads(raw)
+        return parse_timestamptz(cooked_at).isoformat(), UUID(session_id)
+    except (ValueError, TypeError, RuntimeError) as exc:
+        raise ValueError("Invalid history cursor") from exc
+
+
+def latest_timestamp(rows: list[dict[str, Any]], column: str) -> str | None:
+    stamps = [parse_timestamptz(row[column]) for row in rows if row.get(column)]
+    return max(stamps).isoformat() if stamps else None
+
+
+def encode_sync_token(pantry_at: str | None, catalog_at: str | None) -> str:
+    raw = json.dumps([pantry_at, catalog_at], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> tuple[str | None, str | None]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        pantry_at, catalog_at = json.loads(raw)
+        return (
+            parse_timestamptz(pantry_at).isoformat() if pantry_at else None,
+            parse_timestamptz(catalog_at).isoformat() if catalog_at else None,
+        )
+    except (ValueError, TypeError, RuntimeError) as exc:
+        raise ValueError("Invalid sync token") from exc
 
 
 class DBService:
     def __init__(self, access_token: str | None = None) -> None:
-        settings = get_settings()
-        api_key = settings.auth_api_key() or settings.db_api_key()
-        if not settings.supabase_url or not api_key:
-            raise RuntimeError("Supabase database configuration is incomplete")
-        self.client: Client = create_client(settings.supabase_url, api_key)
-        if access_token:
-            self.client.postgrest.auth(access_token)
-
-    def get_pantry(self, user_id: UUID) -> list[PantryIngredient]:
-        ingredients_result = (
-            self.client.table("ingredients")
-            .select("id,name,category,default_unit")
-            .order("name")
-            .execute()
-        )
-        pantry_result = (
+        self.client: AsyncPostgrestClient = get_supabase_pool().client_for(access_token)
+
+    async def get_stocked_pantry(self, user_id: UUID) -> list[PantryIngredient]:
+        result = await self.client.rpc("get_user_pantry", {"in_stock_only": True}).execute()
+        return [PantryIngredient.model_validate(row) for row in (result.data or [])]
+
+    async def get_pantry_state(self, user_id: UUID) -> PantryState:
+        _, pantry_result = await asyncio.gather(
+            get_ingredient_catalog().get(self.client),
             self.client.table("pantry_items")
-            .select("ingredient_id,is_in_stock,quantity")
+            .select("ingredient_id,is_in_stock,quantity,updated_at")
             .eq("user_id", str(user_id))
-            .execute()
+            .execute(),
+        )
+        pantry_rows = pantry_result.data or []
+        # Rows for ingredients newer than the cached catalog would otherwise be dropped.
+        catalog = await get_ingredient_catalog().get_covering(
+            self.client, (row["ingredient_id"] for row in pantry_rows)
+        )
+        return PantryState.from_rows(
+            catalog,
+            pantry_rows,
+            stamp=(len(pantry_rows), latest_timestamp(pantry_rows, "updated_at")),
         )
 
-        pantry_by_ingredient = {
-            row["ingredient_id"]: row for row in pantry_result.data or []
-        }
-
-        items: list[PantryIngredient] = []
-        for ingredient in ingredients_result.data or []:
-            pantry_item = pantry_by_ingredient.get(ingredient["id"])
-            items.append(
-                PantryIngredient(
-                    ingredient_id=ingredient["id"],
-                    name=ingredient["name"],
-                    category=ingredient["category"],
-                    default_unit=ingredient["default_unit"],
-                    is_in_stock=bool(pantry_item["is_in_stock"]) if pantry_item else False,
-                    quantity=pantry_item.get("quantity") if pantry_item else None,
-                )
+    async def get_pantry_changes(self, user_id: UUID, since: str | None = None) -> PantryChangesResponse:
+        if since is None:
+            state = await self.get_pantry_state(user_id)
+            return PantryChangesResponse(
+                items=state.to_models(),
+                next_token=encode_sync_token(state.stamp[1], state.catalog.latest_created_at),
+                full=True,
             )
-        return items
 
-    def upsert_pantry_item(
-        self,
-        user_id: UUID,
-        ingredient_id: int,
-        is_in_stock: bool,
-        quantity: str | None,
-        quantity_provided: bool = True,
-    ) -> None:
-        resolved_quantity = quantity
-        if not quantity_provided:
-            existing = (
+        pantry_since, catalog_since = decode_sync_token(since)
+        pantry_query = (
+            self.client.table("pantry_items")
+            .select("ingredient_id,is_in_stock,quantity,updated_at")
+            .eq("user_id", str(user_id))
+        )
+        catalog_query = self.client.table("ingredients").select("id,created_at")
+        # Rows stamped exactly at the token are re-sent; now() is the transaction
+        # start time, so a strict bound could skip rows committed late.
+        if pantry_since:
+            pantry_query = pantry_query.gte("updated_at", pantry_since)
+        if catalog_since:
+            catalog_query = catalog_query.gte("created_at", catalog_since)
+        pantry_result, catalog_result = await asyncio.gather(
+            pantry_query.order("updated_at").execute(),
+            catalog_query.order("created_at").execute(),
+        )
+        pantry_rows = pantry_result.data or []
+        catalog_rows = catalog_result.data or []
+
+        # New catalog rows need the user's current pantry row even when it predates
+        # pantry_since, or a stocked ingredient would be reported as out of stock.
+        changed_pantry_ids = {row["ingredient_id"] for row in pantry_rows}
+        new_ingredient_ids = [
+            row["id"] for row in catalog_rows if row["id"] not in changed_pantry_ids
+        ]
+        state_rows = pantry_rows
+        if new_ingredient_ids:
+            older_result = await (
                 self.client.table("pantry_items")
-                .select("quantity")
+                .select("ingredient_id,is_in_stock,quantity")
                 .eq("user_id", str(user_id))
-                .eq("ingredient_id", ingredient_id)
-                .limit(1)
+                .in_("ingredient_id", new_ingredient_ids)
                 .execute()
             )
-            if existing.data:
-                resolved_quantity = existing.data[0].get("quantity")
-
-        payload = {
-            "user_id": str(user_id),
-            "ingredient_id": ingredient_id,
-            "is_in_stock": is_in_stock,
-            "quantity": resolved_quantity,
-        }
-        self.client.table("pantry_items").upsert(
-            payload, on_conflict="user_id,ingredient_id"
-        ).execute()
+            state_rows = [*pantry_rows, *(older_result.data or [])]
+
+        changed_ids = [*changed_pantry_ids, *new_ingredient_ids]
+        catalog = await get_ingredient_catalog().get_covering(self.client, changed_ids)
+        state = PantryState.from_rows(catalog, state_rows)
+        return PantryChangesResponse(
+            items=state.to_models(state.positions_of(changed_ids)),
+            next_token=encode_sync_token(
+                latest_timestamp(pantry_rows, "updated_at") or pantry_since,
+                latest_timestamp(catalog_rows, "created_at") or catalog_since,
+            ),
+            full=False,
+        )
+
+    @staticmethod
+    def _pantry_etag(catalog: CatalogSnapshot, stamp: tuple[Any, ...], *variant: Any) -> str:
+        return make_etag(
+            "pantry", len(catalog.items), catalog.latest_created_at, *stamp, *variant
+        )
+
+    async def pantry_etag(self, user_id: UUID, *variant: Any) -> str:
+        catalog, result = await asyncio.gather(
+            get_ingredient_catalog().get(self.client),
+            self.client.table("pantry_items")
+            .select("updated_at", count=CountMethod.exact)
+            .eq("user_id", str(user_id))
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute(),
+        )
+        stamp = (result.count, latest_timestamp(result.data or [], "updated_at"))
+        return self._pantry_etag(catalog, stamp, *variant)
+
+    def pantry_state_etag(self, state: PantryState, *variant: Any) -> str:
+        return self._pantry_etag(state.catalog, state.stamp, *variant)
+
+    async def upsert_pantry_items(self, changes: list[dict[str, Any]]) -> list[PantryIngredient]:
+        result = await self.client.rpc("upsert_pantry_items", {"changes": changes}).execute()
+        return [PantryIngredient.model_validate(row) for row in (result.data or [])]
 
-    def ensure_profile(self, user_id: UUID) -> None:
-        self.client.table("profiles").upsert(
+    async def ensure_profile(self, user_id: UUID) -> None:
+        await get_profile_registry().ensure(user_id, partial(self._upsert_profile, user_id))
+
+    async def _upsert_profile(self, user_id: UUID) -> None:
+        await self.client.table("profiles").upsert(
             {"id": str(user_id)}, on_conflict="id"
         ).execute()
 
-    def list_ingredients(
+    async def list_ingredients(
         self,
         search: str | None = None,
         limit: int = 50,
+        category: str | None = None,
     ) -> list[IngredientSummary]:
-        query = (
-            self.client.table("ingredients")
-            .select("id,name,category,default_unit")
-            .order("name")
-            .limit(limit)
-        )
-        if search:
-            query = query.ilike("name", f"%{search}%")
-        result = query.execute()
-        return [IngredientSummary.model_validate(row) for row in (result.data or [])]
+        catalog = await get_ingredient_catalog().get(self.client)
+        return catalog.search_index.search(search, limit=limit, category=category)
 
-    def create_ingredient(
+    async def create_ingredient(
         self,
         name: str,
         category: str,
         default_unit: str,
     ) -> IngredientSummary:
-        result = (
+        result = await (
             self.client.table("ingredients")
             .insert(
                 {
@@ -132,9 +220,10 @@ class DBService:
         data = (result.data or [None])[0]
         if data is None:
             raise RuntimeError("Ingredient could not be created")
+        get_ingredient_catalog().invalidate()
         return IngredientSummary.model_validate(data)
 
-    def create_cooking_session(
+    async def create_cooking_session(
         self,
         user_id: UUID,
         dish_name: str,
@@ -145,7 +234,7 @@ class DBService:
         recipe_snapshot: dict[str, Any] | None,
         dish_card_snapshot: dict[str, Any] | None,
     ) -> CookSessionResponse:
-        result = (
+        result = await (
             self.client.table("cooking_sessions")
             .insert(
                 {
@@ -166,55 +255,136 @@ class DBService:
             raise RuntimeError("Cooking session could not be created")
         return self._session_row_to_response(data)
 
-    def list_cooking_sessions(self, user_id: UUID, limit: int = 50) -> list[CookSessionResponse]:
-        result = (
+    def _history_query(
+        self,
+        columns: str,
+        user_id: UUID,
+        cursor: str | None,
+        count: CountMethod | None = None,
+    ) -> Any:
+        query = (
             self.client.table("cooking_sessions")
-            .select(
-                "id,dish_name,source_query,people_count,extra_budget_inr,max_time_minutes,"
-                "recipe_snapshot,dish_card_snapshot,cooked_at"
+            .select(columns, count=count)
+            .eq("user_id", str(user_id))
+        )
+        if cursor:
+            cooked_at, session_id = decode_history_cursor(cursor)
+            query = query.or_(
+                f'cooked_at.lt."{cooked_at}",'
+                f'and(cooked_at.eq."{cooked_at}",id.lt.{session_id})'
             )
+        return query.order("cooked_at", desc=True)
+
+    async def list_cooking_sessions(
+        self,
+        user_id: UUID,
+        limit: int = 50,
+        cursor: str | None = None,
+        fields: HistoryFields = "full",
+        include_ist: bool = True,
+    ) -> tuple[HistoryListResponse, str]:
+        columns = SESSION_SUMMARY_COLUMNS if fields == "summary" else SESSION_COLUMNS
+        result = await (
+            self._history_query(columns, user_id, cursor, CountMethod.exact)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
+        rows = result.data or []
+        etag = make_etag(
+            "history",
+            result.count,
+            rows[0]["cooked_at"] if rows else None,
+            limit,
+            cursor,
+            fields,
+            include_ist,
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_history_cursor(rows[-1]["cooked_at"], rows[-1]["id"])
+        history = HistoryListResponse(
+            items=[self._session_row_to_response(row, include_ist) for row in rows],
+            next_cursor=next_cursor,
+        )
+        return history, etag
+
+    async def list_recipe_snapshots(
+        self, user_id: UUID, dish_name: str, limit: int = 3
+    ) -> list[dict[str, Any]]:
+        result = await (
+            self.client.table("cooking_sessions")
+            .select("dish_name,recipe_snapshot")
             .eq("user_id", str(user_id))
+            .ilike("dish_name", _LIKE_WILDCARDS.sub("_", dish_name.strip()))
+            .not_.is_("recipe_snapshot", "null")
             .order("cooked_at", desc=True)
             .limit(limit)
             .execute()
         )
-        return [self._session_row_to_response(row) for row in (result.data or [])]
+        key = ingredient_key(dish_name)
+        return [
+            row["recipe_snapshot"]
+            for row in (result.data or [])
+            if isinstance(row.get("recipe_snapshot"), dict)
+            and ingredient_key(row["dish_name"]) == key
+        ]
 
-    def get_cooking_session_detail(self, user_id: UUID, session_id: UUID) -> HistoryDetailResponse:
-        session_result = (
-            self.client.table("cooking_sessions")
-            .select(
-                "id,dish_name,source_query,people_count,extra_budget_inr,max_time_minutes,"
-                "recipe_snapshot,dish_card_snapshot,cooked_at"
-            )
-            .eq("user_id", str(user_id))
-            .eq("id", str(session_id))
+    async def history_etag(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None,
+        fields: HistoryFields,
+        include_ist: bool,
+    ) -> str:
+        # Same filter as list_cooking_sessions, so the stamp and the page agree on the tag.
+        result = await (
+            self._history_query("cooked_at", user_id, cursor, CountMethod.exact)
             .limit(1)
             .execute()
         )
-        session_row = (session_result.data or [None])[0]
-        if session_row is None:
-            raise RuntimeError("Cooking session not found")
+        latest = result.data[0]["cooked_at"] if result.data else None
+        return make_etag("history", result.count, latest, limit, cursor, fields, include_ist)
 
-        followup_result = (
+    async def get_cooking_session_detail(
+        self, user_id: UUID, session_id: UUID, include_ist: bool = True
+    ) -> HistoryDetailResponse:
+        session_result, followup_result = await asyncio.gather(
+            self.client.table("cooking_sessions")
+            .select(SESSION_COLUMNS)
+            .eq("user_id", str(user_id))
+            .eq("id", str(session_id))
+            .limit(1)
+            .execute(),
             self.client.table("cooking_followups")
             .select("id,question,answer,created_at")
             .eq("user_id", str(user_id))
             .eq("session_id", str(session_id))
             .order("created_at", desc=False)
-            .execute()
+            .execute(),
+        )
+        session_row = (session_result.data or [None])[0]
+        if session_row is None:
+            raise RuntimeError("Cooking session not found")
+
+        followups = [
+            self._followup_row_to_response(row, include_ist) for row in (followup_result.data or [])
+        ]
+        return HistoryDetailResponse(
+            session=self._session_row_to_response(session_row, include_ist),
+            followups=followups,
         )
-        followups = [self._followup_row_to_response(row) for row in (followup_result.data or [])]
-        return HistoryDetailResponse(session=self._session_row_to_response(session_row), followups=followups)
 
-    def create_cooking_followup(
+    async def create_cooking_followup(
         self,
         user_id: UUID,
         session_id: UUID,
         question: str,
         answer: str,
     ) -> None:
-        self.client.table("cooking_followups").insert(
+        await self.client.table("cooking_followups").insert(
             {
                 "user_id": str(user_id),
                 "session_id": str(session_id),
@@ -223,9 +393,11 @@ class DBService:
             }
         ).execute()
 
-    def _session_row_to_response(self, row: dict[str, Any]) -> CookSessionResponse:
-        cooked_at = self._parse_timestamptz(row.get("cooked_at"))
-        ist = cooked_at.astimezone(ZoneInfo("Asia/Kolkata"))
+    def _session_row_to_response(
+        self, row: dict[str, Any], include_ist: bool = True
+    ) -> CookSessionResponse:
+        cooked_at = parse_timestamptz(row.get("cooked_at"))
+        labels = ist_labels(cooked_at) if include_ist else None
         return CookSessionResponse(
             id=row["id"],
             dish_name=row["dish_name"],
@@ -236,28 +408,20 @@ class DBService:
             recipe_snapshot=row.get("recipe_snapshot"),
             dish_card_snapshot=row.get("dish_card_snapshot"),
             cooked_at=cooked_at,
-            cooked_at_ist=ist.strftime("%Y-%m-%d %I:%M %p IST"),
-            cooked_day_ist=ist.strftime("%A"),
-            cooked_date_ist=ist.strftime("%d %b %Y"),
-            cooked_time_ist=ist.strftime("%I:%M %p IST"),
+            cooked_at_ist=labels.full if labels else None,
+            cooked_day_ist=labels.day if labels else None,
+            cooked_date_ist=labels.date if labels else None,
+            cooked_time_ist=labels.time if labels else None,
         )
 
-    def _followup_row_to_response(self, row: dict[str, Any]) -> FollowupMessage:
-        created_at = self._parse_timestamptz(row.get("created_at"))
-        ist = created_at.astimezone(ZoneInfo("Asia/Kolkata"))
+    def _followup_row_to_response(
+        self, row: dict[str, Any], include_ist: bool = True
+    ) -> FollowupMessage:
+        created_at = parse_timestamptz(row.get("created_at"))
         return FollowupMessage(
             id=row["id"],
             question=row["question"],
             answer=row["answer"],
             created_at=created_at,
-            created_at_ist=ist.strftime("%Y-%m-%d %I:%M %p IST"),
+            created_at_ist=ist_labels(created_at).full if include_ist else None,
         )
-
-    @staticmethod
-    def _parse_timestamptz(value: Any) -> datetime:
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            normalized = value.replace("Z", "+00:00")
-            return datetime.fromisoformat(normalized)
-        raise RuntimeError("Invalid timestamp format returned by database")
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_DURATION = re.compile(
+    rf"({_NUMBER})(?:\s*(?:-|–|to)\s*({_NUMBER}))?\s*"
+    r"(hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)?(?![a-z])"
+)
+_COMPACT_HOURS = re.compile(r"(\d\s*(?:hours?|hrs?|h))\s*(\d{1,2})(?![\d.]|\s*[a-z])")
+_CURRENCY = r"(?:₹|rs\.?|inr)?\s*"
+_AMOUNT = re.compile(
+    rf"({_NUMBER})(?:\s*(?:-|–|to)\s*{_CURRENCY}({_NUMBER}))?\s*(k)?\b"
+)
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3})")
+
+
+@lru_cache(maxsize=4096)
+def parse_minutes(raw: str | None) -> float | None:
+    if not raw:
+        return None
+    text = _COMPACT_HOURS.sub(r"\1 \2m", raw.strip().lower())
+    total = 0.0
+    unitless: float | None = None
+    for low, high, unit in _DURATION.findall(text):
+        value = float(high or low)
+        if not unit:
+            if unitless is None:
+                unitless = value
+            continue
+        if unit.startswith("h"):
+            total += value * 60
+        elif unit.startswith("s"):
+            total += value / 60
+        else:
+            total += value
+    if total:
+        return total
+    return unitless
+
+
+@lru_cache(maxsize=4096)
+def parse_inr(raw: str | None) -> float | None:
+    if not raw:
+        return None
+    text = _THOUSANDS.sub("", raw.lower())
+    match = _AMOUNT.search(text)
+    if match is None:
+        return None
+    low, high, thousands = match.groups()
+    amount = (float(low) + float(high or low)) / 2
+    return amount * 1000 if thousands else amount
+
+
+@dataclass(frozen=True)
+class RankingWeights:
+    time: float = 0.4
+    budget: float = 0.2
+    match: float = 0.4
+
+
+class DishFeatures(NamedTuple):
+    minutes: float | None
+    extra_cost: float | None
+    match: float
+
+
+def _score_order(entry: tuple[float, int, bool, dict[str, Any]]) -> tuple[float, int]:
+    return entry[0], entry[1]
+
+
+class DishRanker:
+    def __init__(self, weights: RankingWeights | None = None, limit: int = 5) -> None:
+        self.weights = weights or RankingWeights()
+        self.limit = limit
+
+    @staticmethod
+    def features(dish: dict[str, Any]) -> DishFeatures:
+        extra_cost: float | None = 0.0
+        for item in dish.get("missing_items") or []:
+            cost = parse_inr(str(item.get("cost_est") or "")) if isinstance(item, dict) else None
+            if cost is None:
+                extra_cost = None
+                break
+            extra_cost += cost
+        try:
+            match = float(dish.get("match_score") or 0) / 100
+        except (TypeError, ValueError):
+            match = 0.0
+        return DishFeatures(
+            minutes=parse_minutes(str(dish.get("cooking_time") or "")),
+            extra_cost=extra_cost,
+            match=min(max(match, 0.0), 1.0),
+        )
+
+    @staticmethod
+    def time_fit(minutes: float | None, max_minutes: int | None) -> float:
+        if max_minutes is None:
+            return 1.0
+        if minutes is None:
+            return 0.5
+        if minutes <= max_minutes:
+            # Prefer dishes that use the time the user offered over trivially short ones.
+            return 1.0 - 0.5 * (max_minutes - minutes) / max_minutes
+        return 0.5 * max(0.0, 1.0 - (minutes - max_minutes) / max_minutes)
+
+    @staticmethod
+    def budget_fit(extra_cost: float | None, budget: float | None) -> float:
+        if budget is None:
+            return 1.0
+        if extra_cost is None:
+            return 0.5
+        if extra_cost <= budget:
+            return 1.0
+        if budget <= 0:
+            return 0.0
+        return max(0.0, 1.0 - (extra_cost - budget) / budget)
+
+    def rank(
+        self,
+        dishes: list[dict[str, Any]],
+        max_time_minutes: int | None = None,
+        extra_budget_inr: str | None = None,
+    ) -> list[dict[str, Any]]:
+        budget = parse_inr(extra_budget_inr)
+        time_weight, budget_weight, match_weight = (
+            self.weights.time,
+            self.weights.budget,
+            self.weights.match,
+        )
+        features, time_fit, budget_fit = self.features, self.time_fit, self.budget_fit
+        scored: list[tuple[float, int, bool, dict[str, Any]]] = []
+        for index, dish in enumerate(dishes):
+            if not isinstance(dish, dict):
+                continue
+            minutes, extra_cost, match = features(dish)
+            score = (
+                time_weight * time_fit(minutes, max_time_minutes)
+                + budget_weight * budget_fit(extra_cost, budget)
+                + match_weight * match
+            )
+            over_time = (
+                max_time_minutes is not None and minutes is not None and minutes > max_time_minutes
+            )
+            scored.append((-score, index, over_time, dish))
+        scored.sort(key=_score_order)
+
+        ranked: list[dict[str, Any]] = []
+        kept_over_time = False
+        for _, _, over_time, dish in scored:
+            if over_time:
+                if kept_over_time:
+                    continue
+                kept_over_time = True
+            ranked.append(dish)
+        return ranked[: self.limit]
+
+
+@lru_cache
+def get_dish_ranker() -> DishRanker:
+    return DishRanker()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+from app.config import Settings, get_settings
+
+
+class GroqClientPool:
+    def __init__(self, settings: Settings) -> None:
+        self.max_clients = max(1, settings.groq_client_pool_size)
+        self.idle_seconds = settings.groq_client_idle_seconds
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.groq_max_connections,
+                max_keepalive_connections=settings.groq_max_keepalive_connections,
+            )
+        )
+        self._clients: OrderedDict[str, tuple[float, AsyncGroq]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.reuses = 0
+        self.evictions = 0
+
+    def client_for(self, api_key: str) -> AsyncGroq:
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            self.acquisitions += 1
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.reuses += 1
+                client = entry[1]
+            else:
+                client = AsyncGroq(api_key=api_key, http_client=self.http_client)
+            self._clients[key] = (now, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def _evict_idle(self, now: float) -> None:
+        while self._clients:
+            last_used, _ = next(iter(self._clients.values()))
+            if now - last_used < self.idle_seconds:
+                return
+            self._clients.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "acquisitions": self.acquisitions,
+            "reuses": self.reuses,
+            "evictions": self.evictions,
+            "reuse_rate": round(self.reuses / self.acquisitions, 4) if self.acquisitions else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        self._clients.clear()
+        await self.http_client.aclose()
+
+
+@lru_cache
+def get_groq_pool() -> GroqClientPool:
+    return GroqClientPool(get_settings())
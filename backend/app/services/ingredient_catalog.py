@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from postgrest import AsyncPostgrestClient, CountMethod
+
+from app.config import get_settings
+from app.models.schemas import IngredientSummary
+from app.services.ingredient_search import IngredientSearchIndex
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    items: tuple[IngredientSummary, ...]
+    latest_created_at: str | None
+    search_index: IngredientSearchIndex
+    positions: dict[int, int] = field(default_factory=dict)
+
+    def get(self, ingredient_id: int) -> IngredientSummary | None:
+        position = self.positions.get(ingredient_id)
+        return self.items[position] if position is not None else None
+
+
+class IngredientCatalog:
+    def __init__(self, ttl_seconds: float, max_age_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.snapshot: CatalogSnapshot | None = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.freshness_checks = 0
+
+    def is_fresh(self) -> bool:
+        return (
+            self.snapshot is not None
+            and time.monotonic() - self._checked_at < self.ttl_seconds
+        )
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.max_age_seconds
+
+    async def get(self, client: AsyncPostgrestClient) -> CatalogSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and self.is_fresh():
+            return snapshot
+        async with self._lock:
+            if self.snapshot is not None and self.is_fresh():
+                return self.snapshot
+            # The probe only notices inserts and deletes; renames and category fixes
+            # wait for the hard max age.
+            if (
+                self.snapshot is not None
+                and self._loaded_generation == self._generation
+                and not self.is_expired()
+                and not await self._has_changed(client, self.snapshot)
+            ):
+                self._checked_at = time.monotonic()
+                return self.snapshot
+            return await self._load(client)
+
+    async def get_covering(
+        self, client: AsyncPostgrestClient, ingredient_ids: Iterable[int]
+    ) -> CatalogSnapshot:
+        snapshot = await self.get(client)
+        if any(ingredient_id not in snapshot.positions for ingredient_id in ingredient_ids):
+            self.invalidate()
+            snapshot = await self.get(client)
+        return snapshot
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+        self._generation += 1
+
+    async def _has_changed(self, client: AsyncPostgrestClient, snapshot: CatalogSnapshot) -> bool:
+        self.freshness_checks += 1
+        result = await (
+            client.table("ingredients")
+            .select("created_at", count=CountMethod.exact)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        latest = (result.data or [{}])[0].get("created_at")
+        return latest != snapshot.latest_created_at or result.count != len(snapshot.items)
+
+    async def _load(self, client: AsyncPostgrestClient) -> CatalogSnapshot:
+        generation = self._generation
+        result = await (
+            client.table("ingredients")
+            .select("id,name,category,default_unit,created_at")
+            .order("name")
+            .execute()
+        )
+        rows: list[dict[str, Any]] = result.data or []
+        items = tuple(IngredientSummary.model_validate(row) for row in rows)
+        search_index = await asyncio.to_thread(IngredientSearchIndex, items)
+        previous_version = self.snapshot.version if self.snapshot is not None else 0
+        snapshot = CatalogSnapshot(
+            version=previous_version + 1,
+            items=items,
+            latest_created_at=max(
+                (row["created_at"] for row in rows if row.get("created_at")),
+                default=None,
+            ),
+            search_index=search_index,
+            positions={item.id: position for position, item in enumerate(items)},
+        )
+        self.snapshot = snapshot
+        self._checked_at = self._loaded_at = time.monotonic()
+        self._loaded_generation = generation
+        self.loads += 1
+        return snapshot
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version if snapshot is not None else 0,
+            "size": len(snapshot.items) if snapshot is not None else 0,
+            "fresh": self.is_fresh(),
+            "loads": self.loads,
+            "freshness_checks": self.freshness_checks,
+        }
+
+
+@lru_cache
+def get_ingredient_catalog() -> IngredientCatalog:
+    settings = get_settings()
+    return IngredientCatalog(
+        ttl_seconds=settings.ingredient_catalog_ttl_seconds,
+        max_age_seconds=settings.ingredient_catalog_max_age_seconds,
+    )
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+from app.models.schemas import IngredientSummary
+
+EXACT = 0
+PREFIX = 1
+WORD_PREFIX = 2
+SUBSTRING = 3
+FUZZY = 4
+
+MAX_FUZZY_VERIFICATIONS = 32
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(value: str) -> str:
+    return _NON_ALNUM.sub(" ", value.lower()).strip()
+
+
+def ngrams(value: str, size: int) -> set[str]:
+    return {value[index : index + size] for index in range(len(value) - size + 1)}
+
+
+def within_edit_distance(left: str, right: str, max_distance: int) -> bool:
+    if abs(len(left) - len(right)) > max_distance:
+        return False
+    previous_previous: list[int] = []
+    previous = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        current = [i] + [0] * len(right)
+        for j in range(1, len(right) + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                i > 1
+                and j > 1
+                and left[i - 1] == right[j - 2]
+                and left[i - 2] == right[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return False
+        previous_previous, previous = previous, current
+    return previous[-1] <= max_distance
+
+
+class _TrieNode:
+    __slots__ = ("children", "positions")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.positions: list[int] = []
+
+
+class IngredientSearchIndex:
+    def __init__(self, items: Sequence[IngredientSummary]) -> None:
+        self.items = tuple(items)
+        self.names = [normalize_name(item.name) for item in self.items]
+        self.name_trie = _TrieNode()
+        self.word_trie = _TrieNode()
+        self.trigram_postings: dict[str, list[int]] = defaultdict(list)
+        self.word_positions: dict[str, list[int]] = defaultdict(list)
+        self.bigram_postings: dict[int, dict[str, list[str]]] = defaultdict(lambda: defaultdict(list))
+        self.bigram_counts: dict[str, int] = {}
+        self.by_category: dict[str, set[int]] = defaultdict(set)
+
+        for position, name in enumerate(self.names):
+            self._insert(self.name_trie, name, position)
+            for word in dict.fromkeys(name.split()):
+                self._insert(self.word_trie, word, position)
+                self.word_positions[word].append(position)
+            for gram in ngrams(name, 3):
+                self.trigram_postings[gram].append(position)
+            self.by_category[self.items[position].category].add(position)
+
+        for word in self.word_positions:
+            grams = ngrams(f" {word} ", 2)
+            self.bigram_counts[word] = len(grams)
+            for gram in grams:
+                self.bigram_postings[len(word)][gram].append(word)
+
+    @staticmethod
+    def _insert(root: _TrieNode, key: str, position: int) -> None:
+        node = root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            if not node.positions or node.positions[-1] != position:
+                node.positions.append(position)
+
+    @staticmethod
+    def _prefix_positions(root: _TrieNode, prefix: str) -> list[int]:
+        node = root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                return []
+            node = child
+        return node.positions
+
+    def search(
+        self,
+        query: str | None,
+        limit: int = 50,
+        category: str | None = None,
+    ) -> list[IngredientSummary]:
+        allowed = self.by_category.get(category, set()) if category else None
+        normalized = normalize_name(query or "")
+        if not normalized:
+            positions: Iterable[int] = range(len(self.items)) if allowed is None else sorted(allowed)
+            return [self.items[position] for position in positions][:limit]
+
+        ranked: dict[int, tuple[int, float]] = {}
+
+        def offer(positions: Iterable[int], tier: int, score: float = 0.0) -> None:
+            for position in positions:
+                if position in ranked or (allowed is not None and position not in allowed):
+                    continue
+                ranked[position] = (tier, score)
+
+        prefix_positions = self._prefix_positions(self.name_trie, normalized)
+        offer((p for p in prefix_positions if self.names[p] == normalized), EXACT)
+        offer(prefix_positions, PREFIX)
+        query_words = normalized.split()
+        offer(
+            (
+                p
+                for p in self._prefix_positions(self.word_trie, query_words[0])
+                if normalized in self.names[p]
+            ),
+            WORD_PREFIX,
+        )
+        if len(ranked) < limit:
+            offer(self._substring_positions(normalized), SUBSTRING)
+        if len(ranked) < limit:
+            for position, similarity in self._fuzzy_positions(query_words):
+                offer((position,), FUZZY, similarity)
+
+        ordered = sorted(
+            ranked,
+            key=lambda position: (ranked[position][0], -ranked[position][1], position),
+        )
+        return [self.items[position] for position in ordered[:limit]]
+
+    def _substring_positions(self, normalized: str) -> list[int]:
+        if len(normalized) < 3:
+            return [p for p, name in enumerate(self.names) if normalized in name]
+        postings = sorted(
+            (self.trigram_postings.get(gram, []) for gram in ngrams(normalized, 3)),
+            key=len,
+        )
+        return [p for p in postings[0] if normalized in self.names[p]]
+
+    def _fuzzy_positions(self, query_words: list[str]) -> list[tuple[int, float]]:
+        best: dict[int, float] = {}
+        for query_word in query_words:
+            if len(query_word) < 3:
+                continue
+            max_distance = 1 if len(query_word) < 8 else 2
+            query_grams = ngrams(f" {query_word} ", 2)
+            shared: dict[str, int] = defaultdict(int)
+            for length in range(len(query_word) - max_distance, len(query_word) + max_distance + 1):
+                postings = self.bigram_postings.get(length)
+                if not postings:
+                    continue
+                for gram in query_grams:
+                    for word in postings.get(gram, ()):
+                        shared[word] += 1
+
+            # A single edit (transpositions included) breaks at most three bigrams.
+            min_shared = max(1, len(query_grams) - 3 * max_distance)
+            scored = sorted(
+                [
+                    (count / (len(query_grams) + self.bigram_counts[word] - count), word)
+                    for word, count in shared.items()
+                    if count >= min_shared
+                ],
+                reverse=True,
+            )
+            # Similarity only picks and orders candidates; the edit bound decides.
+            for similarity, word in scored[:MAX_FUZZY_VERIFICATIONS]:
+                if not within_edit_distance(query_word, word, max_distance):
+                    continue
+                for position in self.word_positions[word]:
+                    if similarity > best.get(position, -1.0):
+                        best[position] = similarity
+        return sorted(best.items(), key=lambda entry: -entry[1])
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from app.services.ingredient_search import normalize_name
+
+ALWAYS_AVAILABLE = frozenset({"water"})
+UNKNOWN_COST = "N/A"
+# Qualifiers naming another ingredient make a different product: coconut milk is not milk.
+SOURCE_QUALIFIERS = frozenset(
+    "almond cashew chicken coconut corn fish garlic ginger mango mutton oat onion "
+    "peanut rice soy tomato vegetable wheat".split()
+)
+
+_SIBILANT_PLURAL = re.compile(r"(ss|x|ch|sh)es$")
+_CONSONANT_Y = re.compile(r"(?<=[^aeiou])y$")
+
+
+def singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith("ss"):
+        return word
+    # "-ies" is shared by berry/berries and chilli/chillies, so both fold to a trailing "i".
+    if word.endswith("ies"):
+        return word[:-3] + "i"
+    if word.endswith("oes") or _SIBILANT_PLURAL.search(word):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return _CONSONANT_Y.sub("i", word)
+
+
+def ingredient_key(name: str) -> str:
+    return " ".join(singular(word) for word in normalize_name(name).split())
+
+
+class PantryMatcher:
+    def __init__(self, names: Iterable[str]) -> None:
+        self.keys: set[str] = set()
+        self.by_head: dict[str, list[frozenset[str]]] = defaultdict(list)
+        for name in names:
+            key = ingredient_key(name)
+            if not key or key in self.keys:
+                continue
+            self.keys.add(key)
+            words = key.split()
+            self.by_head[words[-1]].append(frozenset(words))
+
+    def has(self, name: str) -> bool:
+        key = ingredient_key(name)
+        if not key or key in self.keys or key in ALWAYS_AVAILABLE:
+            return True
+        # Only qualifiers in front of the head noun may differ: "Basmati Rice" covers
+        # rice, "Rice Flour" does not.
+        words = key.split()
+        required = frozenset(words)
+        for pantry_words in self.by_head.get(words[-1], ()):
+            if required <= pantry_words and not (pantry_words - required) & SOURCE_QUALIFIERS:
+                return True
+        return False
+
+    def score(self, ingredients: list[dict[str, Any]]) -> tuple[int, list[dict[str, str]]]:
+        missing = [
+            {
+                "name": str(item["name"]).strip(),
+                "cost_est": str(item.get("cost_est") or UNKNOWN_COST),
+            }
+            for item in ingredients
+            if not self.has(str(item["name"]))
+        ]
+        covered = len(ingredients) - len(missing)
+        return round(100 * covered / len(ingredients)), missing
+
+    def score_dish(self, dish: dict[str, Any]) -> dict[str, Any]:
+        ingredients = [
+            item
+            for item in (
+                {"name": entry} if isinstance(entry, str) else entry
+                for entry in dish.pop("ingredients", None) or []
+            )
+            if isinstance(item, dict) and str(item.get("name") or "").strip()
+        ]
+        if not ingredients:
+            dish.setdefault("match_score", 0)
+            dish.setdefault("missing_items", [])
+            dish["ingredients"] = []
+            return dish
+        dish["match_score"], dish["missing_items"] = self.score(ingredients)
+        dish["ingredients"] = [str(item["name"]).strip() for item in ingredients]
+        return dish
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from app.models.schemas import PantryIngredient
+from app.services.ingredient_catalog import CatalogSnapshot
+
+
+class PantryState:
+    __slots__ = ("catalog", "stock", "quantities", "stamp")
+
+    def __init__(
+        self,
+        catalog: CatalogSnapshot,
+        stock: int = 0,
+        quantities: dict[int, str] | None = None,
+        stamp: tuple[Any, ...] = (),
+    ) -> None:
+        self.catalog = catalog
+        self.stock = stock
+        self.quantities = quantities or {}
+        self.stamp = stamp
+
+    @classmethod
+    def from_rows(
+        cls,
+        catalog: CatalogSnapshot,
+        rows: Iterable[dict[str, Any]],
+        stamp: tuple[Any, ...] = (),
+    ) -> PantryState:
+        stocked: list[int] = []
+        quantities: dict[int, str] = {}
+        for row in rows:
+            position = catalog.positions.get(row["ingredient_id"])
+            if position is None:
+                continue
+            if row.get("is_in_stock"):
+                stocked.append(position)
+            if row.get("quantity") is not None:
+                quantities[position] = row["quantity"]
+        stock = 0
+        for position in stocked:
+            stock |= 1 << position
+        return cls(catalog, stock, quantities, stamp)
+
+    def stocked_positions(self) -> list[int]:
+        positions: list[int] = []
+        remaining = self.stock
+        while remaining:
+            lowest = remaining & -remaining
+            positions.append(lowest.bit_length() - 1)
+            remaining ^= lowest
+        return positions
+
+    def diff(self, other: PantryState) -> list[int]:
+        if other.catalog is not self.catalog:
+            raise ValueError("Pantry states belong to different catalog snapshots")
+        changed = self.stock ^ other.stock
+        for position in self.quantities.keys() | other.quantities.keys():
+            if self.quantities.get(position) != other.quantities.get(position):
+                changed |= 1 << position
+        return PantryState(self.catalog, changed).stocked_positions()
+
+    def positions_of(self, ingredient_ids: Iterable[int]) -> list[int]:
+        positions = self.catalog.positions
+        return sorted({positions[id_] for id_ in ingredient_ids if id_ in positions})
+
+    def to_models(self, positions: Iterable[int] | None = None) -> list[PantryIngredient]:
+        items = self.catalog.items
+        stock = self.stock
+        return [
+            PantryIngredient(
+                ingredient_id=items[position].id,
+                name=items[position].name,
+                category=items[position].category,
+                default_unit=items[position].default_unit,
+                is_in_stock=bool(stock >> position & 1),
+                quantity=self.quantities.get(position),
+            )
+            for position in (range(len(items)) if positions is None else positions)
+        ]
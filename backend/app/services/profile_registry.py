@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from app.config import get_settings
+from app.services.cache import SingleFlight, TTLCache
+
+
+class ProfileRegistry:
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.known: TTLCache[UUID, bool] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.flights: SingleFlight[UUID, None] = SingleFlight()
+
+    async def ensure(self, user_id: UUID, upsert: Callable[[], Awaitable[None]]) -> None:
+        if self.known.get(user_id):
+            return
+        await self.flights.do(user_id, upsert)
+        self.known.set(user_id, True)
+
+    def forget(self, user_id: UUID) -> None:
+        self.known.pop(user_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.known.stats(), **self.flights.stats()}
+
+
+@lru_cache
+def get_profile_registry() -> ProfileRegistry:
+    settings = get_settings()
+    return ProfileRegistry(
+        max_entries=settings.profile_cache_max_entries,
+        ttl_seconds=settings.profile_cache_ttl_seconds,
+    )
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from app.config import get_settings
+from app.models.schemas import RecipeAssistantResponse
+from app.services.cache import TTLCache
+from app.services.match_scoring import ingredient_key
+
+RecipeGenerator = Callable[[str], Awaitable[RecipeAssistantResponse]]
+PrefetchTask = asyncio.Task[RecipeAssistantResponse]
+
+
+class RecipePrefetcher:
+    def __init__(
+        self,
+        top_n: int,
+        max_concurrency: int,
+        ttl_seconds: float,
+        max_users: int,
+    ) -> None:
+        self.top_n = top_n
+        self.by_user: TTLCache[UUID, dict[str, PrefetchTask]] = TTLCache(
+            max_entries=max_users, ttl_seconds=ttl_seconds
+        )
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: set[PrefetchTask] = set()
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.hits = 0
+
+    def schedule(self, user_id: UUID, dish_names: list[str], generate: RecipeGenerator) -> None:
+        self.cancel(user_id)
+        tasks: dict[str, PrefetchTask] = {}
+        for dish_name in dish_names:
+            key = ingredient_key(dish_name)
+            if not key or key in tasks:
+                continue
+            if len(tasks) >= self.top_n:
+                break
+            task = asyncio.create_task(self._run(generate, dish_name))
+            task.add_done_callback(self._finish)
+            self._tasks.add(task)
+            tasks[key] = task
+            self.scheduled += 1
+        if tasks:
+            self.by_user.set(user_id, tasks)
+
+    def cancel(self, user_id: UUID) -> None:
+        tasks = self.by_user.get(user_id)
+        if not tasks:
+            return
+        self.by_user.pop(user_id)
+        for task in tasks.values():
+            task.cancel()
+
+    async def take(self, user_id: UUID, dish_name: str) -> RecipeAssistantResponse | None:
+        task = (self.by_user.get(user_id) or {}).get(ingredient_key(dish_name))
+        if task is None:
+            return None
+        try:
+            response = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+        self.hits += 1
+        return response
+
+    async def _run(self, generate: RecipeGenerator, dish_name: str) -> RecipeAssistantResponse:
+        async with self._semaphore:
+            return await generate(dish_name)
+
+    def _finish(self, task: PrefetchTask) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.by_user.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "users": len(self.by_user),
+            "in_flight": len(self._tasks),
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "hits": self.hits,
+        }
+
+
+@lru_cache
+def get_recipe_prefetcher() -> RecipePrefetcher:
+    settings = get_settings()
+    return RecipePrefetcher(
+        top_n=settings.recipe_prefetch_top_n,
+        max_concurrency=settings.recipe_prefetch_max_concurrency,
+        ttl_seconds=settings.recipe_prefetch_ttl_seconds,
+        max_users=settings.recipe_prefetch_max_users,
+    )
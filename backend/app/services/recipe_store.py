@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.config import get_settings
+from app.models.schemas import PantryIngredient, RecipeDetail
+from app.services.cache import TTLCache
+from app.services.match_scoring import PantryMatcher, ingredient_key
+
+
+def pantry_fingerprint(pantry_items: Iterable[PantryIngredient]) -> str:
+    keys = sorted({ingredient_key(item.name) for item in pantry_items if item.is_in_stock})
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+class RecipeStore:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        min_coverage: int,
+        variants_per_dish: int,
+    ) -> None:
+        self.generated: TTLCache[str, tuple[tuple[str, RecipeDetail], ...]] = TTLCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+        self.min_coverage = min_coverage
+        self.variants_per_dish = max(1, variants_per_dish)
+        self.reused = 0
+        self.generated_count = 0
+        self.rejected = 0
+
+    def remember(
+        self, dish_name: str, pantry_items: list[PantryIngredient], recipe: RecipeDetail
+    ) -> None:
+        key = ingredient_key(dish_name)
+        if not key:
+            return
+        fingerprint = pantry_fingerprint(pantry_items)
+        variants = [
+            entry for entry in self.generated.get(key, ()) if entry[0] != fingerprint
+        ]
+        variants.insert(0, (fingerprint, recipe))
+        self.generated.set(key, tuple(variants[: self.variants_per_dish]))
+        self.generated_count += 1
+
+    def find(
+        self,
+        dish_name: str,
+        pantry_items: list[PantryIngredient],
+        snapshots: Iterable[dict[str, Any]] = (),
+    ) -> RecipeDetail | None:
+        key = ingredient_key(dish_name)
+        if not key:
+            return None
+        fingerprint = pantry_fingerprint(pantry_items)
+        candidates: list[RecipeDetail] = []
+        for stored_fingerprint, recipe in self.generated.get(key, ()):
+            if stored_fingerprint == fingerprint:
+                self.reused += 1
+                return recipe
+            candidates.append(recipe)
+        for snapshot in snapshots:
+            try:
+                candidates.append(RecipeDetail.model_validate(snapshot))
+            except ValidationError:
+                continue
+        if not candidates:
+            return None
+
+        matcher = PantryMatcher(item.name for item in pantry_items if item.is_in_stock)
+        best: RecipeDetail | None = None
+        best_coverage = -1
+        for recipe in candidates:
+            if not recipe.ingredients:
+                continue
+            coverage, _ = matcher.score([{"name": item.name} for item in recipe.ingredients])
+            if coverage > best_coverage:
+                best, best_coverage = recipe, coverage
+        if best is None or best_coverage < self.min_coverage:
+            self.rejected += 1
+            return None
+        self.reused += 1
+        return best
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.generated.stats(),
+            "reused": self.reused,
+            "stored": self.generated_count,
+            "rejected": self.rejected,
+        }
+
+
+@lru_cache
+def get_recipe_store() -> RecipeStore:
+    settings = get_settings()
+    return RecipeStore(
+        max_entries=settings.recipe_store_max_entries,
+        ttl_seconds=settings.recipe_store_ttl_seconds,
+        min_coverage=settings.recipe_store_min_coverage,
+        variants_per_dish=settings.recipe_store_variants_per_dish,
+    )
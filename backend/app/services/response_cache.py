@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Protocol
+
+from pydantic_core import to_json
+
+from app.config import get_settings
+from app.services.cache import TTLCache
+
+
+class CacheBackend(Protocol):
+    blocking: bool
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def size(self) -> int: ...
+
+
+class MemoryCacheBackend:
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.entries: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> str | None:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.entries.set(key, value)
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class SQLiteCacheBackend:
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("pragma journal_mode=wal")
+        self._connection.execute(
+            "create table if not exists response_cache ("
+            "key text primary key, value text not null, "
+            "expires_at real not null, accessed_at real not null)"
+        )
+        self._connection.execute(
+            "create index if not exists response_cache_accessed_at_idx "
+            "on response_cache(accessed_at)"
+        )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "select value, expires_at from response_cache where key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._connection.execute("delete from response_cache where key = ?", (key,))
+                return None
+            self._connection.execute(
+                "update response_cache set accessed_at = ? where key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "insert or replace into response_cache (key, value, expires_at, accessed_at) "
+                "values (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._connection.execute("delete from response_cache where expires_at <= ?", (now,))
+            self._connection.execute(
+                "delete from response_cache where key in ("
+                "select key from response_cache order by accessed_at desc limit -1 offset ?)",
+                (self.max_entries,),
+            )
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute("select count(*) from response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(namespace: str, payload: dict[str, Any]) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"{namespace}:{digest}"
+
+    async def get(self, key: str) -> Any | None:
+        if self.backend.blocking:
+            raw = await asyncio.to_thread(self.backend.get, key)
+        else:
+            raw = self.backend.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        raw = to_json(value).decode("utf-8")
+        if self.backend.blocking:
+            await asyncio.to_thread(self.backend.set, key, raw)
+        else:
+            self.backend.set(key, raw)
+        self.stores += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    backend: CacheBackend
+    if settings.response_cache_backend == "sqlite":
+        backend = SQLiteCacheBackend(
+            path=settings.response_cache_path,
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+    else:
+        backend = MemoryCacheBackend(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+    return ResponseCache(backend)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic_core import to_json
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {to_json(data).decode('utf-8')}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield sse_event(event, data)
+    except ValueError as exc:
+        yield sse_event("error", {"status_code": 400, "detail": str(exc)})
+    except Exception as exc:  # pragma: no cover
+        yield sse_event("error", {"status_code": 500, "detail": str(exc)})
+
+
+class JsonArrayStreamer:
+    def __init__(self, keys: set[str]) -> None:
+        self.keys = keys
+        self.text = ""
+        self._position = 0
+        self._stack: list[tuple[str, str | None, int]] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: str | None = None
+        self._pending_key: str | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.text += chunk
+        emitted: list[tuple[str, Any]] = []
+        text = self.text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start : index + 1]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":":
+                if self._last_string is not None:
+                    self._pending_key = json.loads(self._last_string)
+            elif char == "[":
+                self._stack.append(("[", self._pending_key, index))
+                self._pending_key = None
+            elif char == "{":
+                self._stack.append(("{", None, index))
+                self._pending_key = None
+            elif char in "]}":
+                if not self._stack:
+                    continue
+                kind, _, start = self._stack.pop()
+                if kind == "{" and self._stack:
+                    parent_kind, parent_key, _ = self._stack[-1]
+                    if parent_kind == "[" and parent_key in self.keys:
+                        try:
+                            emitted.append((parent_key, json.loads(text[start : index + 1])))
+                        except ValueError:
+                            pass
+            elif char == ",":
+                self._pending_key = None
+                self._last_string = None
+        self._position = len(text)
+        return emitted
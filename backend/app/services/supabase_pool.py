@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+
+from app.config import Settings, get_settings
+
+
+class SupabasePool:
+    def __init__(self, settings: Settings) -> None:
+        api_key = settings.auth_api_key() or settings.db_api_key()
+        if not settings.supabase_url or not api_key:
+            raise RuntimeError("Supabase database configuration is incomplete")
+        self.api_key = api_key
+        self.rest_url = f"{settings.supabase_url}/rest/v1"
+        self.limits = httpx.Limits(
+            max_connections=settings.supabase_max_connections,
+            max_keepalive_connections=settings.supabase_pool_size,
+            keepalive_expiry=settings.supabase_idle_timeout_seconds,
+        )
+        self.http_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(http2=True, limits=self.limits),
+            timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+        self.clients_issued = 0
+        self.requests_sent = 0
+        self.http2_responses = 0
+
+    async def _on_request(self, _: httpx.Request) -> None:
+        self.requests_sent += 1
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.http_version == "HTTP/2":
+            self.http2_responses += 1
+
+    def client_for(self, access_token: str | None = None) -> AsyncPostgrestClient:
+        self.clients_issued += 1
+        return AsyncPostgrestClient(
+            self.rest_url,
+            headers={
+                "apikey": self.api_key,
+                "Authorization": f"Bearer {access_token or self.api_key}",
+            },
+            http_client=self.http_client,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pool_size": self.limits.max_keepalive_connections,
+            "max_connections": self.limits.max_connections,
+            "idle_timeout_seconds": self.limits.keepalive_expiry,
+            "clients_issued": self.clients_issued,
+            "requests_sent": self.requests_sent,
+            "http2_responses": self.http2_responses,
+        }
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+
+@lru_cache
+def get_supabase_pool() -> SupabasePool:
+    return SupabasePool(get_settings())
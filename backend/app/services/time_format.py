@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+# Asia/Kolkata has had a fixed +05:30 offset with no DST since 1945.
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+
+class IstLabels(NamedTuple):
+    full: str
+    day: str
+    date: str
+    time: str
+
+
+def parse_timestamptz(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    raise RuntimeError("Invalid timestamp format returned by database")
+
+
+@lru_cache(maxsize=4096)
+def _date_labels(day: date) -> tuple[str, str, str]:
+    return day.strftime("%Y-%m-%d"), day.strftime("%A"), day.strftime("%d %b %Y")
+
+
+def ist_labels(value: datetime) -> IstLabels:
+    ist = value.astimezone(IST)
+    iso_date, day_name, display_date = _date_labels(ist.date())
+    hour = ist.hour % 12 or 12
+    clock = f"{hour:02d}:{ist.minute:02d} {'AM' if ist.hour < 12 else 'PM'} IST"
+    return IstLabels(full=f"{iso_date} {clock}", day=day_name, date=display_date, time=clock)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from starlette.responses import Response
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = (time.perf_counter() - start) * 1000
+
+    def server_timing(self) -> str:
+        entries = [*self.stages.items(), ("total", (time.perf_counter() - self.started) * 1000)]
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in entries)
+
+    def apply(self, response: Response) -> None:
+        response.headers["Server-Timing"] = self.server_timing()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+import httpx
+import jwt
+from pydantic import BaseModel
+
+from app.config import Settings, get_settings
+from app.services.cache import TTLCache
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+
+
+class InvalidTokenError(ValueError):
+    pass
+
+
+class AuthUnavailableError(RuntimeError):
+    pass
+
+
+class TokenIdentity(BaseModel):
+    id: UUID
+    email: str | None = None
+
+
+class JWKSCache:
+    def __init__(self, settings: Settings, http_client: httpx.AsyncClient) -> None:
+        self.settings = settings
+        self.http_client = http_client
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str | None) -> jwt.PyJWK | None:
+        if not kid:
+            return None
+        if self._is_stale(self.settings.jwks_refresh_seconds):
+            await self.refresh(self.settings.jwks_refresh_seconds)
+        key = self._keys.get(kid)
+        if key is None and self._is_stale(self.settings.jwks_min_refresh_interval_seconds):
+            await self.refresh(self.settings.jwks_min_refresh_interval_seconds)
+            key = self._keys.get(kid)
+        return key
+
+    async def refresh(self, max_age_seconds: float = 0) -> None:
+        async with self._lock:
+            if not self._is_stale(max_age_seconds):
+                return
+            self._fetched_at = time.monotonic()
+            try:
+                response = await self.http_client.get(
+                    f"{self.settings.supabase_url}/auth/v1/.well-known/jwks.json",
+                    headers={"apikey": self.settings.auth_api_key()},
+                    timeout=5.0,
+                )
+                response.raise_for_status()
+                key_set = jwt.PyJWKSet.from_dict(response.json())
+            except (httpx.HTTPError, ValueError, jwt.PyJWTError):
+                return
+            self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+
+    def _is_stale(self, max_age_seconds: float) -> bool:
+        return time.monotonic() - self._fetched_at >= max_age_seconds
+
+
+class TokenVerifier:
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.http_client = httpx.AsyncClient(timeout=10.0)
+        self.jwks = JWKSCache(settings, self.http_client)
+        self.results: TTLCache[str, TokenIdentity | str] = TTLCache(
+            max_entries=settings.auth_cache_max_entries,
+            ttl_seconds=settings.auth_cache_ttl_seconds,
+        )
+        self.remote_checks = 0
+
+    async def verify(self, token: str) -> TokenIdentity:
+        cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        cached = self.results.get(cache_key)
+        if isinstance(cached, TokenIdentity):
+            return cached
+        if isinstance(cached, str):
+            raise InvalidTokenError(cached)
+
+        try:
+            identity, expires_at = await self._verify(token)
+        except InvalidTokenError as exc:
+            self.results.set(
+                cache_key,
+                str(exc),
+                ttl_seconds=self.settings.auth_negative_cache_ttl_seconds,
+            )
+            raise
+
+        ttl = float(self.settings.auth_cache_ttl_seconds)
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        self.results.set(cache_key, identity, ttl_seconds=ttl)
+        return identity
+
+    async def _verify(self, token: str) -> tuple[TokenIdentity, float | None]:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as exc:
+            raise InvalidTokenError("Invalid or expired access token") from exc
+
+        algorithm = header.get("alg")
+        if algorithm == "HS256" and self.settings.supabase_jwt_secret:
+            return self._verify_local(token, self.settings.supabase_jwt_secret, algorithm)
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            signing_key = await self.jwks.get_key(header.get("kid"))
+            if signing_key is not None:
+                return self._verify_local(token, signing_key.key, algorithm)
+        return await self._verify_remote(token), None
+
+    def _verify_local(self, token: str, key: Any, algorithm: str) -> tuple[TokenIdentity, float | None]:
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.settings.supabase_jwt_audience,
+                options={"require": ["exp", "sub"]},
+                leeway=self.settings.auth_clock_skew_seconds,
+            )
+        except jwt.PyJWTError as exc:
+            raise InvalidTokenError("Invalid or expired access token") from exc
+
+        try:
+            identity = TokenIdentity(id=UUID(claims["sub"]), email=claims.get("email"))
+        except ValueError as exc:
+            raise InvalidTokenError("Token payload missing user id") from exc
+        return identity, float(claims["exp"])
+
+    async def _verify_remote(self, token: str) -> TokenIdentity:
+        self.remote_checks += 1
+        try:
+            response = await self.http_client.get(
+                f"{self.settings.supabase_url}/auth/v1/user",
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "apikey": self.settings.auth_api_key(),
+                },
+            )
+        except httpx.HTTPError as exc:
+            raise AuthUnavailableError("Supabase auth service unavailable") from exc
+
+        if response.status_code != 200:
+            raise InvalidTokenError("Invalid or expired access token")
+
+        payload = response.json()
+        user_id = payload.get("id")
+        if not user_id:
+            raise InvalidTokenError("Token payload missing user id")
+        return TokenIdentity(id=UUID(user_id), email=payload.get("email"))
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.results.stats(), "remote_checks": self.remote_checks}
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier:
+    return TokenVerifier(get_settings())
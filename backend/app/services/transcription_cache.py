@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import IO, Any
+
+from app.config import get_settings
+from app.services.cache import SingleFlight, TTLCache
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def audio_digest(audio: bytes | IO[bytes]) -> str:
+    digest = hashlib.sha256()
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        digest.update(audio)
+        return digest.hexdigest()
+    start = audio.tell()
+    while chunk := audio.read(_HASH_CHUNK_BYTES):
+        digest.update(chunk)
+    audio.seek(start)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.transcripts: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.flights: SingleFlight[str, str] = SingleFlight()
+
+    async def key_for(self, model: str, audio: bytes | IO[bytes]) -> str:
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            return f"{model}:{audio_digest(audio)}"
+        return f"{model}:{await asyncio.to_thread(audio_digest, audio)}"
+
+    async def get_or_transcribe(
+        self,
+        key: str,
+        transcribe: Callable[[], Awaitable[str]],
+        coalesce: bool = True,
+    ) -> str:
+        transcript = self.transcripts.get(key)
+        if transcript is not None:
+            return transcript
+
+        async def load() -> str:
+            text = await transcribe()
+            self.transcripts.set(key, text)
+            return text
+
+        if not coalesce:
+            return await load()
+        return await self.flights.do(key, load)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.transcripts.stats(), **self.flights.stats()}
+
+
+@lru_cache
+def get_transcription_cache() -> TranscriptionCache:
+    settings = get_settings()
+    return TranscriptionCache(
+        max_entries=settings.transcription_cache_max_entries,
+        ttl_seconds=settings.transcription_cache_ttl_seconds,
+    )
@@ -0,0 +1,121 @@
+"""Re-ranking cost for a cached suggestion set.
+
+Compares the previous time-only ranking (uncompiled regexes per dish) with
+DishRanker, cold (parsers' caches cleared) and warm.
+
+Run from backend/: python -m benchmarks.dish_ranking
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import timeit
+from typing import Any
+
+from app.services.dish_ranking import DishRanker, parse_inr, parse_minutes
+
+DISHES: list[dict[str, Any]] = [
+    {
+        "name": "Onion Pakora",
+        "match_score": 75,
+        "missing_items": [{"name": "Besan", "cost_est": "₹40-60"}],
+        "cooking_time": "25 mins",
+    },
+    {
+        "name": "Tomato Rice",
+        "match_score": 100,
+        "missing_items": [],
+        "cooking_time": "1 hr",
+    },
+    {
+        "name": "Paneer Butter Masala",
+        "match_score": 60,
+        "missing_items": [
+            {"name": "Paneer", "cost_est": "Rs. 120"},
+            {"name": "Cream", "cost_est": "₹50"},
+        ],
+        "cooking_time": "1.5 hrs",
+    },
+    {
+        "name": "Kachumber Salad",
+        "match_score": 90,
+        "missing_items": [{"name": "Cucumber", "cost_est": "20"}],
+        "cooking_time": "10-15 min",
+    },
+    {
+        "name": "Masala Omelette",
+        "match_score": 80,
+        "missing_items": [{"name": "Eggs", "cost_est": "N/A"}],
+        "cooking_time": "about 15",
+    },
+]
+
+
+def legacy_extract_minutes(raw: Any) -> int | None:
+    if raw is None:
+        return None
+    text = str(raw).strip().lower()
+    if not text:
+        return None
+    minutes = 0
+    matched = False
+    hour_match = re.search(r"(\d+)\s*(h|hr|hrs|hour|hours)", text)
+    if hour_match:
+        minutes += int(hour_match.group(1)) * 60
+        matched = True
+    minute_match = re.search(r"(\d+)\s*(m|min|mins|minute|minutes)", text)
+    if minute_match:
+        minutes += int(minute_match.group(1))
+        matched = True
+    if matched:
+        return minutes
+    digits = re.search(r"\d+", text)
+    return int(digits.group(0)) if digits else None
+
+
+def legacy_rank(dishes: list[dict[str, Any]], max_time_minutes: int) -> list[dict[str, Any]]:
+    under: list[tuple[float, int, dict[str, Any]]] = []
+    over: list[tuple[float, int, dict[str, Any]]] = []
+    unknown: list[tuple[int, dict[str, Any]]] = []
+    for index, dish in enumerate(dishes):
+        minutes = legacy_extract_minutes(dish.get("cooking_time"))
+        if minutes is None:
+            unknown.append((index, dish))
+            continue
+        score = abs(minutes - max_time_minutes)
+        (under if minutes <= max_time_minutes else over).append((score, index, dish))
+    under.sort(key=lambda item: (item[0], item[1]))
+    over.sort(key=lambda item: (item[0], item[1]))
+    ordered = [dish for _, _, dish in under]
+    if over:
+        ordered.append(over[0][2])
+    ordered.extend(dish for _, dish in unknown)
+    return ordered[:5]
+
+
+def main() -> None:
+    ranker = DishRanker()
+    dishes = copy.deepcopy(DISHES)
+
+    def cold() -> None:
+        parse_minutes.cache_clear()
+        parse_inr.cache_clear()
+        ranker.rank(dishes, max_time_minutes=30, extra_budget_inr="₹100")
+
+    cases = {
+        "legacy time-only": lambda: legacy_rank(dishes, max_time_minutes=30),
+        "ranker cold": cold,
+        "ranker warm": lambda: ranker.rank(dishes, max_time_minutes=30, extra_budget_inr="₹100"),
+    }
+    rounds = 20000
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+        print(f"{name:>17}: {seconds * 1e6:6.2f} us per {len(dishes)}-dish set")
+
+    print("legacy order:", [dish["name"] for dish in legacy_rank(dishes, 30)])
+    print("ranker order:", [dish["name"] for dish in ranker.rank(dishes, 30, "₹100")])
+
+
+if __name__ == "__main__":
+    main()
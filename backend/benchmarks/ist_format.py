@@ -0,0 +1,52 @@
+"""Compare the per-row IST formatting used before with the cached path.
+
+Run from backend/: python -m benchmarks.ist_format
+"""
+
+from __future__ import annotations
+
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.services.time_format import ist_labels, parse_timestamptz
+
+
+def legacy_labels(value: str) -> tuple[str, str, str, str]:
+    ist = datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(ZoneInfo("Asia/Kolkata"))
+    return (
+        ist.strftime("%Y-%m-%d %I:%M %p IST"),
+        ist.strftime("%A"),
+        ist.strftime("%d %b %Y"),
+        ist.strftime("%I:%M %p IST"),
+    )
+
+
+def cached_labels(value: str) -> tuple[str, str, str, str]:
+    return tuple(ist_labels(parse_timestamptz(value)))
+
+
+def sample_timestamps(count: int) -> list[str]:
+    rng = random.Random(7)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        (start + timedelta(minutes=rng.randrange(0, 60 * 24 * 120))).isoformat()
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    page = sample_timestamps(200) + [value.replace("+00:00", "Z") for value in sample_timestamps(800)]
+    for value in page:
+        assert legacy_labels(value) == cached_labels(value), value
+
+    rounds = 50
+    for name, func in (("legacy", legacy_labels), ("cached", cached_labels)):
+        seconds = min(timeit.repeat(lambda: [func(value) for value in page], number=rounds, repeat=5))
+        per_row_us = seconds / (rounds * len(page)) * 1e6
+        print(f"{name:>7}: {per_row_us:.2f} us/row ({len(page)} rows x {rounds})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Pantry coverage checks and scoring cost for one LLM suggestion set.
+
+Verifies the head-noun rule in both directions (a qualified pantry item covers
+the bare ingredient; a bare or differently-headed pantry item does not cover a
+more specific one), then times PantryMatcher construction and scoring.
+
+Run from backend/: python -m benchmarks.match_scoring
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from app.services.match_scoring import PantryMatcher
+
+COVERAGE_CASES: list[tuple[list[str], str, bool]] = [
+    (["Basmati Rice"], "rice", True),
+    (["Red Chilli Powder"], "chilli powder", True),
+    (["Green Chilli"], "green chillies", True),
+    (["Full Cream Milk"], "milk", True),
+    (["Eggs"], "egg", True),
+    (["Rice Flour"], "rice", False),
+    (["Coconut Milk"], "milk", False),
+    (["Chicken Stock"], "chicken", False),
+    (["Tomato Ketchup"], "tomato", False),
+    (["Egg Noodles"], "egg", False),
+    (["Egg"], "egg noodles", False),
+    (["Milk"], "coconut milk", False),
+    (["Potato"], "sweet potato", False),
+]
+
+PANTRY = [
+    "Basmati Rice",
+    "Onion",
+    "Tomato",
+    "Green Chilli",
+    "Ginger",
+    "Garlic",
+    "Turmeric Powder",
+    "Red Chilli Powder",
+    "Cumin Seeds",
+    "Paneer",
+    "Eggs",
+    "Milk",
+    "Butter",
+    "Rice Flour",
+    "Coconut Milk",
+    "Curry Leaves",
+]
+
+INGREDIENTS = [
+    {"name": name, "cost_est": "₹30"}
+    for name in (
+        "rice",
+        "onions",
+        "tomatoes",
+        "green chillies",
+        "ginger garlic paste",
+        "turmeric",
+        "chilli powder",
+        "cumin",
+        "paneer",
+        "cream",
+        "egg noodles",
+        "water",
+    )
+]
+
+
+def check_coverage() -> None:
+    failures = [
+        (pantry, name, expected)
+        for pantry, name, expected in COVERAGE_CASES
+        if PantryMatcher(pantry).has(name) is not expected
+    ]
+    for pantry, name, expected in failures:
+        print(f"FAIL: {pantry} covers {name!r} should be {expected}")
+    if failures:
+        raise SystemExit(1)
+    print(f"coverage cases: {len(COVERAGE_CASES)} ok")
+
+
+def main() -> None:
+    check_coverage()
+    matcher = PantryMatcher(PANTRY)
+    cases = {
+        "build matcher": lambda: PantryMatcher(PANTRY),
+        "score dish": lambda: matcher.score(INGREDIENTS),
+    }
+    rounds = 20000
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+        print(f"{name:>13}: {seconds * 1e6:6.2f} us")
+    score, missing = matcher.score(INGREDIENTS)
+    print(f"match_score={score} missing={[item['name'] for item in missing]}")
+
+
+if __name__ == "__main__":
+    main()
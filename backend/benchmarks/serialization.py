@@ -0,0 +1,113 @@
+"""Per-endpoint response serialization cost.
+
+Compares the stdlib path (jsonable_encoder + json.dumps), orjson on the
+dumped model, and FastAPI's response_model path (validate + pydantic-core
+JSON), which is what the routes use.
+
+Run from backend/: python -m benchmarks.serialization
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from app.models.schemas import (
+    CookSessionResponse,
+    HistoryListResponse,
+    PantryIngredient,
+    PantryResponse,
+)
+from app.services.time_format import ist_labels
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def history_payload(rows: int, summary: bool) -> HistoryListResponse:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for index in range(rows):
+        cooked_at = start + timedelta(hours=index * 7)
+        labels = ist_labels(cooked_at)
+        recipe = {
+            "name": f"Dish {index}",
+            "ingredients": [{"name": f"item {n}", "quantity": "2 pcs"} for n in range(12)],
+            "steps": [f"Step {n}: stir and simmer for a few minutes" for n in range(10)],
+        }
+        items.append(
+            CookSessionResponse(
+                id=uuid.uuid4(),
+                dish_name=f"Dish {index}",
+                source_query="something quick with paneer",
+                people_count=2,
+                max_time_minutes=30,
+                recipe_snapshot=None if summary else recipe,
+                dish_card_snapshot=None if summary else {"name": f"Dish {index}", "time": "20 min"},
+                cooked_at=cooked_at,
+                cooked_at_ist=labels.full,
+                cooked_day_ist=labels.day,
+                cooked_date_ist=labels.date,
+                cooked_time_ist=labels.time,
+            )
+        )
+    return HistoryListResponse(items=items)
+
+
+def pantry_payload(rows: int) -> PantryResponse:
+    return PantryResponse(
+        items=[
+            PantryIngredient(
+                ingredient_id=index,
+                name=f"Ingredient {index}",
+                category="Vegetables",
+                default_unit="pcs",
+                is_in_stock=index % 3 == 0,
+                quantity="1 kg" if index % 3 == 0 else None,
+            )
+            for index in range(rows)
+        ]
+    )
+
+
+def serializers(model: BaseModel) -> dict[str, Callable[[], bytes]]:
+    field = create_model_field(name="Response", type_=type(model), mode="serialization")
+
+    def response_model_path() -> bytes:
+        value, _ = field.validate(model, {}, loc=("response",))
+        return field.serialize_json(value, by_alias=True)
+
+    paths: dict[str, Callable[[], bytes]] = {
+        "stdlib": lambda: json.dumps(jsonable_encoder(model)).encode("utf-8"),
+        "response_model": response_model_path,
+    }
+    if orjson is not None:
+        paths["orjson"] = lambda: orjson.dumps(model.model_dump())
+    return paths
+
+
+def main() -> None:
+    endpoints = {
+        "GET /history (200 rows)": history_payload(200, summary=False),
+        "GET /history?fields=summary": history_payload(200, summary=True),
+        "GET /pantry (1000 items)": pantry_payload(1000),
+    }
+    for endpoint, model in endpoints.items():
+        print(endpoint)
+        for name, func in serializers(model).items():
+            rounds = 20
+            seconds = min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+            print(f"  {name:>14}: {seconds * 1000:7.2f} ms  {len(func()) / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+import hmac
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
@@ -7,8 +11,32 @@ from app.routers.chat import router as chat_router
 from app.routers.history import router as history_router
 from app.routers.ingredients import router as ingredients_router
 from app.routers.pantry import router as pantry_router
+from app.services.ai_service import get_llm_flights
+from app.services.groq_pool import get_groq_pool
+from app.services.ingredient_catalog import get_ingredient_catalog
+from app.services.profile_registry import get_profile_registry
+from app.services.recipe_prefetch import get_recipe_prefetcher
+from app.services.recipe_store import get_recipe_store
+from app.services.response_cache import get_response_cache
+from app.services.supabase_pool import get_supabase_pool
+from app.services.token_verifier import get_token_verifier
+from app.services.transcription_cache import get_transcription_cache
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    if get_supabase_pool.cache_info().currsize:
+        await get_supabase_pool().aclose()
+    if get_token_verifier.cache_info().currsize:
+        await get_token_verifier().aclose()
+    if get_recipe_prefetcher.cache_info().currsize:
+        await get_recipe_prefetcher().aclose()
+    if get_groq_pool.cache_info().currsize:
+        await get_groq_pool().aclose()
+
 
-app = FastAPI(title="PantryPilot API", version="0.1.0")
+app = FastAPI(title="PantryPilot API", version="0.1.0", lifespan=lifespan)
 settings = get_settings()
 
 app.add_middleware(
@@ -25,6 +53,32 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def require_stats_token(x_stats_token: str | None = Header(default=None)) -> None:
+    expected = get_settings().health_stats_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_stats_token or not hmac.compare_digest(x_stats_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid stats token")
+
+
+@app.get("/health/stats", tags=["health"], dependencies=[Depends(require_stats_token)])
+def health_stats() -> dict[str, Any]:
+    stats: dict[str, Any] = {
+        "auth_tokens": get_token_verifier().stats(),
+        "groq_clients": get_groq_pool().stats(),
+        "ingredient_catalog": get_ingredient_catalog().stats(),
+        "llm_calls": get_llm_flights().stats(),
+        "prefetch": get_recipe_prefetcher().stats(),
+        "profiles": get_profile_registry().stats(),
+        "recipes": get_recipe_store().stats(),
+        "response_cache": get_response_cache().stats(),
+        "transcriptions": get_transcription_cache().stats(),
+    }
+    if get_supabase_pool.cache_info().currsize:
+        stats["supabase_pool"] = get_supabase_pool().stats()
+    return stats
+
+
 app.include_router(pantry_router)
 app.include_router(chat_router)
 app.include_router(auth_router)
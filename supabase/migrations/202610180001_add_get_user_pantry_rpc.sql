@@ -0,0 +1,46 @@
+create index if not exists pantry_items_user_id_in_stock_idx
+on public.pantry_items(user_id)
+where is_in_stock;
+
+create or replace function public.get_user_pantry(in_stock_only boolean default false)
+returns table (
+  ingredient_id bigint,
+  name text,
+  category text,
+  default_unit text,
+  is_in_stock boolean,
+  quantity text
+)
+language plpgsql
+stable
+security invoker
+set search_path = public
+as $$
+begin
+  if in_stock_only then
+    return query
+    select i.id, i.name, i.category, i.default_unit, p.is_in_stock, p.quantity
+    from public.pantry_items p
+    join public.ingredients i on i.id = p.ingredient_id
+    where p.user_id = auth.uid()
+      and p.is_in_stock
+    order by i.name;
+  else
+    return query
+    select
+      i.id,
+      i.name,
+      i.category,
+      i.default_unit,
+      coalesce(p.is_in_stock, false),
+      p.quantity
+    from public.ingredients i
+    left join public.pantry_items p
+      on p.ingredient_id = i.id
+     and p.user_id = auth.uid()
+    order by i.name;
+  end if;
+end;
+$$;
+
+grant execute on function public.get_user_pantry(boolean) to authenticated;
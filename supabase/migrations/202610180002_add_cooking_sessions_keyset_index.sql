@@ -0,0 +1,4 @@
+create index if not exists cooking_sessions_user_id_cooked_at_id_idx
+on public.cooking_sessions(user_id, cooked_at desc, id desc);
+
+drop index if exists public.cooking_sessions_user_id_cooked_at_idx;
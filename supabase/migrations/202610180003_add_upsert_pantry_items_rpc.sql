@@ -0,0 +1,43 @@
+create or replace function public.upsert_pantry_items(changes jsonb)
+returns table (
+  ingredient_id bigint,
+  name text,
+  category text,
+  default_unit text,
+  is_in_stock boolean,
+  quantity text
+)
+language sql
+volatile
+security invoker
+set search_path = public
+as $$
+  with input as (
+    select distinct on ((change->>'ingredient_id')::bigint)
+      (change->>'ingredient_id')::bigint as ingredient_id,
+      coalesce((change->>'status')::boolean, false) as is_in_stock,
+      change ? 'quantity' as quantity_provided,
+      change->>'quantity' as quantity
+    from jsonb_array_elements(changes) with ordinality as entries(change, ordinal)
+    order by (change->>'ingredient_id')::bigint, ordinal desc
+  ),
+  upserted as (
+    insert into public.pantry_items as p (user_id, ingredient_id, is_in_stock, quantity)
+    select auth.uid(), i.ingredient_id, i.is_in_stock, i.quantity
+    from input i
+    on conflict (user_id, ingredient_id) do update
+      set is_in_stock = excluded.is_in_stock,
+          quantity = case
+            when (select i.quantity_provided from input i where i.ingredient_id = excluded.ingredient_id)
+              then excluded.quantity
+            else p.quantity
+          end
+    returning p.ingredient_id, p.is_in_stock, p.quantity
+  )
+  select u.ingredient_id, ing.name, ing.category, ing.default_unit, u.is_in_stock, u.quantity
+  from upserted u
+  join public.ingredients ing on ing.id = u.ingredient_id
+  order by ing.name;
+$$;
+
+grant execute on function public.upsert_pantry_items(jsonb) to authenticated;
@@ -0,0 +1,5 @@
+create index if not exists pantry_items_user_id_updated_at_idx
+on public.pantry_items(user_id, updated_at);
+
+create index if not exists ingredients_created_at_idx
+on public.ingredients(created_at);